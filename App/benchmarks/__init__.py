@@ -0,0 +1,5 @@
+"""Controller benchmarks over synthetic datasets.
+
+Run with `python -m App.benchmarks --sizes 1000 10000 --out bench.json` and
+compare two result files with `--compare old.json`.
+"""
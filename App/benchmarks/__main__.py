@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import sqlalchemy
+
+from App.main import create_app
+from App.database import db
+from App.controllers import update_leaderboard
+from .seed import seed
+from .runner import run_benchmarks
+
+# A benchmark this much slower than the baseline is reported as a regression
+REGRESSION_RATIO = 1.25
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, logs_per_student, repeat, database_url, only):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            url = database_url or f"sqlite:///{os.path.join(tmp, f'bench-{size}.db')}"
+            create_app({'SQLALCHEMY_DATABASE_URI': url})
+            db.drop_all()
+            db.create_all()
+            counts = seed(size, logs_per_student=logs_per_student)
+            update_leaderboard()
+            print(f"Seeded {counts['students']} students, {counts['logs']} logs on {db.engine.dialect.name}", file=sys.stderr)
+            results[str(size)] = {'dataset': counts, 'benchmarks': run_benchmarks(repeat=repeat, only=only)}
+            for name, result in results[str(size)]['benchmarks'].items():
+                print(f"  {name:28} {result}", file=sys.stderr)
+            db.drop_all()
+            db.session.remove()
+            db.engine.dispose()
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'database': 'custom' if database_url else 'sqlite',
+            'repeat': repeat,
+        },
+        'results': results
+    }
+
+
+def compare(baseline, current):
+    """Print per-benchmark wall time and query count changes; returns the
+    number of regressions."""
+    regressions = 0
+    for size, data in current['results'].items():
+        old = baseline['results'].get(size, {}).get('benchmarks', {})
+        print(f"{size} students")
+        for name, result in data['benchmarks'].items():
+            before = old.get(name)
+            if not before or 'wall_ms' not in before or 'wall_ms' not in result:
+                continue
+            ratio = result['wall_ms'] / before['wall_ms'] if before['wall_ms'] else 1.0
+            flag = ''
+            if ratio > REGRESSION_RATIO or result['queries'] > before['queries']:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"  {name:28} {before['wall_ms']:>10.2f} -> {result['wall_ms']:>10.2f} ms ({ratio:.2f}x)"
+                  f"  queries {before['queries']} -> {result['queries']}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m App.benchmarks', description="Benchmark the controllers over synthetic datasets.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='student counts to benchmark (e.g. 1000 10000 100000)')
+    parser.add_argument('--logs-per-student', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--database-url', help='benchmark against this database (e.g. a local Postgres) '
+                                               'instead of temporary SQLite files; its tables are dropped')
+    parser.add_argument('--only', nargs='+', help='run only these benchmarks')
+    parser.add_argument('--out', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='compare against a previous results file')
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.logs_per_student, args.repeat, args.database_url, args.only)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            return 1 if compare(json.load(f), report) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
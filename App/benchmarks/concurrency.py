@@ -0,0 +1,83 @@
+"""Concurrent leaderboard reads on Postgres, with psycopg2 blocking the gevent
+loop and with the cooperative wait callback installed.
+
+Must start fully monkey-patched, the way a gunicorn gevent worker runs:
+
+    python -m gevent.monkey --module App.benchmarks.concurrency \\
+        --database-url postgresql://localhost/bench --clients 50 --requests 2000
+
+The target database's tables are dropped and reseeded.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from gevent import monkey
+from gevent.pool import Pool
+
+from App.main import create_app
+from App.database import db, gevent_wait_callback, pool_stats
+from App.controllers import update_leaderboard
+from .seed import seed
+
+
+def run_clients(client, url, clients, requests):
+    latencies = []
+
+    def one_request(_):
+        started = time.perf_counter()
+        response = client.get(url)
+        latencies.append(time.perf_counter() - started)
+        return response.status_code
+
+    started = time.perf_counter()
+    statuses = Pool(clients).map(one_request, range(requests))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests_per_s': round(requests / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        'errors': sum(status != 200 for status in statuses)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gevent.monkey --module App.benchmarks.concurrency',
+                                     description='Benchmark concurrent leaderboard reads under gevent.')
+    parser.add_argument('--database-url', required=True, help='Postgres URL; its tables are dropped')
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=50, help='concurrent greenlets')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=None, help='leaderboard page size (default: full board)')
+    args = parser.parse_args(argv)
+    if not monkey.is_module_patched('socket'):
+        parser.error('run through `python -m gevent.monkey --module App.benchmarks.concurrency`')
+
+    from psycopg2 import extensions
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database_url, 'WEB_WORKERS': 1,
+                      'WORKER_CONNECTIONS': args.clients})
+    db.drop_all()
+    db.create_all()
+    seed(args.students, logs_per_student=3)
+    update_leaderboard()
+    db.session.remove()
+
+    client = app.test_client()
+    url = '/api/leaderboard' + (f'?limit={args.limit}' if args.limit else '')
+    client.get(url)
+    results = {}
+    for mode, callback in (('blocking', None), ('cooperative', gevent_wait_callback)):
+        extensions.set_wait_callback(callback)
+        results[mode] = run_clients(client, url, args.clients, args.requests)
+        print(f"{mode:12} {results[mode]}", file=sys.stderr)
+    results['speedup'] = round(results['cooperative']['requests_per_s'] / results['blocking']['requests_per_s'], 2)
+    results['pool'] = pool_stats()
+    print(json.dumps(results, indent=2))
+    db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+from functools import partial
+
+from App.database import db
+from App.sqlstats import instrument, collect
+from App.models import ActivityLog, Student
+from App.controllers import (
+    login,
+    get_all_users_json,
+    staff_log_hours,
+    staff_log_hours_bulk,
+    request_confirmation,
+    view_leaderboard,
+    view_accolades,
+    staff_confirm_hours,
+    staff_confirm_hours_batch,
+    staff_reject_hours,
+    staff_reject_hours_batch,
+    award_accolades,
+    update_leaderboard
+)
+from .seed import LOGIN_USERNAME, LOGIN_PASSWORD
+
+BATCH_SIZE = 200
+
+
+class Workload:
+    """Per-dataset state the benchmarks draw their arguments from, so write
+    benchmarks always act on rows that are still pending."""
+
+    def __init__(self, seed_value=7):
+        self.rng = random.Random(seed_value)
+        self.students = db.session.scalars(db.select(Student.username)).all()
+        self.pending = db.session.scalars(db.select(ActivityLog.logID).filter_by(status='pending')).all()
+        self.rng.shuffle(self.pending)
+
+    def student(self):
+        return self.rng.choice(self.students)
+
+    def take_pending(self, count=1):
+        if len(self.pending) < count:
+            raise LookupError('not enough pending logs left')
+        taken, self.pending = self.pending[:count], self.pending[count:]
+        return taken
+
+
+def benchmarks(work):
+    """(name, factory) pairs, reads before writes. Each factory draws fresh
+    arguments and returns the zero-argument callable to time."""
+    def bulk_entries():
+        return [{'student_username': work.student(), 'hours': 2, 'activity': 'Benchmark'} for _ in range(BATCH_SIZE)]
+
+    return [
+        ('login', lambda: partial(login, LOGIN_USERNAME, LOGIN_PASSWORD)),
+        ('get_all_users_json', lambda: get_all_users_json),
+        ('view_leaderboard', lambda: view_leaderboard),
+        ('view_leaderboard_top50', lambda: partial(view_leaderboard, limit=50)),
+        ('view_accolades', lambda: partial(view_accolades, work.student())),
+        ('staff_log_hours', lambda: partial(staff_log_hours, 'staff0', work.student(), 2, 'Benchmark')),
+        ('staff_log_hours_bulk', lambda: partial(staff_log_hours_bulk, 'staff0', bulk_entries())),
+        ('request_confirmation', lambda: partial(request_confirmation, work.student(), None)),
+        ('staff_confirm_hours', lambda: partial(staff_confirm_hours, 'staff0', work.take_pending()[0])),
+        ('staff_confirm_hours_batch', lambda: partial(staff_confirm_hours_batch, 'staff0', work.take_pending(BATCH_SIZE))),
+        ('staff_reject_hours', lambda: partial(staff_reject_hours, 'staff0', work.take_pending()[0])),
+        ('staff_reject_hours_batch', lambda: partial(staff_reject_hours_batch, 'staff0', work.take_pending(BATCH_SIZE))),
+        ('award_accolades', lambda: award_accolades),
+        ('update_leaderboard', lambda: update_leaderboard),
+    ]
+
+
+def _run_once(fn, trace_memory):
+    db.session.remove()
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    with collect() as stats:
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+    return elapsed, stats, peak
+
+
+def run_benchmarks(repeat=3, only=None):
+    """Time every benchmark against the current app's database. Wall time is
+    the median of `repeat` runs; peak memory comes from one extra traced run."""
+    instrument(db.engine)
+    work = Workload()
+    results = {}
+    for name, factory in benchmarks(work):
+        if only and name not in only:
+            continue
+        try:
+            timings = [_run_once(factory(), False) for _ in range(repeat)]
+            _, _, peak = _run_once(factory(), True)
+        except LookupError as e:
+            results[name] = {'skipped': str(e)}
+            continue
+        results[name] = {
+            'wall_ms': round(statistics.median(t for t, _, _ in timings) * 1000, 3),
+            'db_ms': round(statistics.median(s.duration_ms for _, s, _ in timings), 3),
+            'queries': max(s.count for _, s, _ in timings),
+            'max_repeat': max(max(s.shapes.values(), default=0) for _, s, _ in timings),
+            'peak_kib': round(peak / 1024, 1)
+        }
+    db.session.remove()
+    return results
@@ -0,0 +1,59 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from App.database import db
+from App.models import User, Student, Staff, ActivityLog
+from App.hashing import hash_password
+
+LOGIN_USERNAME = 'bench_login'
+LOGIN_PASSWORD = 'bench_login_pass'
+# Statuses of seeded logs and their relative weights
+STATUS_WEIGHTS = (('confirmed', 6), ('pending', 2), ('logged', 1), ('rejected', 1))
+
+
+def _chunks(rows, size=5000):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def seed(students, logs_per_student=5, staff=10, seed_value=42):
+    """Fill an empty schema with `students` students, `staff` staff and about
+    `logs_per_student` activity logs each, using bulk inserts. Every seeded
+    user shares one cheap password hash except LOGIN_USERNAME, which uses
+    the configured hashing so the login benchmark measures the real cost."""
+    rng = random.Random(seed_value)
+    cheap_hash = generate_password_hash('password', 'pbkdf2:sha256:1000')
+    users, student_rows, staff_rows, logs = [], [], [], []
+    statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+    start = datetime.utcnow() - timedelta(days=365)
+
+    for index in range(students):
+        user_id = str(uuid.uuid4())
+        users.append({'userID': user_id, 'username': f'student{index}', 'password': cheap_hash, 'user_type': 'student'})
+        student_rows.append({'studentID': user_id, 'totalHours': 0, 'points': 0})
+        for _ in range(rng.randint(0, 2 * logs_per_student)):
+            logs.append({
+                'logID': str(uuid.uuid4()),
+                'studentID': user_id,
+                'hoursLogged': rng.randint(1, 8),
+                'dateLogged': start + timedelta(minutes=rng.randint(0, 525600)),
+                'status': rng.choice(statuses),
+                'description': 'Seeded activity'
+            })
+    for index in range(staff):
+        user_id = str(uuid.uuid4())
+        users.append({'userID': user_id, 'username': f'staff{index}', 'password': cheap_hash, 'user_type': 'staff'})
+        staff_rows.append({'staffID': user_id})
+    login_id = str(uuid.uuid4())
+    users.append({'userID': login_id, 'username': LOGIN_USERNAME,
+                  'password': hash_password(LOGIN_PASSWORD), 'user_type': 'user'})
+
+    for table, rows in ((User.__table__, users), (Student.__table__, student_rows),
+                        (Staff.__table__, staff_rows), (ActivityLog.__table__, logs)):
+        for chunk in _chunks(rows):
+            db.session.execute(db.insert(table), chunk)
+    db.session.commit()
+    return {'users': len(users), 'students': students, 'staff': staff, 'logs': len(logs)}
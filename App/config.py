@@ -1,4 +1,7 @@
 import os
+import tempfile
+
+from App.database import engine_options
 
 def load_config(app, overrides):
     if os.path.exists(os.path.join('./App', 'custom_config.py')):
@@ -15,5 +18,62 @@ def load_config(app, overrides):
     app.config["JWT_COOKIE_SECURE"] = True
     app.config["JWT_COOKIE_CSRF_PROTECT"] = False
     app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
+    app.config.setdefault('USER_CACHE_SIZE', 1024)
+    app.config.setdefault('USER_CACHE_TTL', 60)
+    # werkzeug method string with cost parameters, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'
+    app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt')
+    app.config.setdefault('PASSWORD_SALT_LENGTH', 16)
+    # Seconds clients may reuse versioned GET responses before revalidating
+    app.config.setdefault('HTTP_CACHE_MAX_AGE', 0)
+    # Live leaderboard stream: seconds between event-table polls per worker,
+    # keepalive comment interval, per-connection backlog and event retention
+    app.config.setdefault('LEADERBOARD_STREAM_POLL_INTERVAL', 1.0)
+    app.config.setdefault('LEADERBOARD_STREAM_KEEPALIVE', 15)
+    app.config.setdefault('LEADERBOARD_STREAM_QUEUE_SIZE', 100)
+    app.config.setdefault('LEADERBOARD_EVENT_RETENTION', 3600)
+    # Seconds of recent events re-read on every poll, since event IDs from a
+    # sequence can commit out of order; must exceed the longest write transaction
+    app.config.setdefault('LEADERBOARD_EVENT_OVERLAP', 30)
+    # Per-request statement count/DB time headers and N+1 warnings; when off
+    # no SQLAlchemy listeners are registered at all
+    app.config.setdefault('SQL_STATS_ENABLED', False)
+    app.config.setdefault('SQL_STATS_REPEAT_THRESHOLD', 10)
+    # Prometheus request/pool metrics served at /metrics
+    app.config.setdefault('METRICS_ENABLED', True)
+    # SQLite connection profile (ignored on other databases); see App.database.SQLITE_PRAGMAS
+    app.config.setdefault('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config.setdefault('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT', 5000)  # milliseconds
+    app.config.setdefault('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)  # bytes
+    app.config.setdefault('SQLITE_CACHE_SIZE', -20000)  # negative means KiB
+    app.config.setdefault('SQLITE_TEMP_STORE', 'MEMORY')
+    # Tie semantics of /api/students/<username>/rank: 'competition' (1224) or 'dense' (1223)
+    app.config.setdefault('LEADERBOARD_RANKING', 'competition')
+    # Seconds between each worker's rank index catching up on the event feed
+    app.config.setdefault('RANK_INDEX_REFRESH_INTERVAL', 1.0)
+    # Seconds each process keeps its milestone definitions before rereading them
+    app.config.setdefault('MILESTONE_CACHE_TTL', 30)
+    # First day ('MM-DD') of each academic term, for window=term leaderboards
+    app.config.setdefault('ACADEMIC_TERM_STARTS', ['01-15', '05-15', '09-01'])
+    # Run each request's view in one unit_of_work(): a single commit per request,
+    # rolled back on errors and error responses
+    app.config.setdefault('UNIT_OF_WORK_PER_REQUEST', False)
+    # Seconds between checks for jobs queued by other processes
+    app.config.setdefault('JOB_POLL_INTERVAL', 2.0)
+    # Seconds a job may stay running before it is assumed abandoned (its
+    # worker crashed) and queued again; keep it above the longest import
+    app.config.setdefault('JOB_TIMEOUT', 3600)
+    # Where uploaded import files wait for their background job
+    app.config.setdefault('IMPORT_UPLOAD_DIR', os.path.join(tempfile.gettempdir(), 'flask-imports'))
+    # Largest request body (e.g. an import upload) accepted, in bytes; larger ones get a 413
+    app.config.setdefault('MAX_CONTENT_LENGTH', 64 * 1024 * 1024)
+    # Connection pool sizing for server databases: gunicorn worker processes,
+    # greenlets per worker and the total connections the database allows us
+    app.config.setdefault('WEB_WORKERS', 4)
+    app.config.setdefault('WORKER_CONNECTIONS', 1000)
+    app.config.setdefault('DB_MAX_CONNECTIONS', 80)
+    app.config.setdefault('DB_POOL_TIMEOUT', 10)
+    app.config.setdefault('DB_POOL_RECYCLE', 1800)
     for key in overrides:
-        app.config[key] = overrides[key]
\ No newline at end of file
+        app.config[key] = overrides[key]
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
\ No newline at end of file
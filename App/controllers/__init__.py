@@ -2,3 +2,7 @@ from .user import *
 from .auth import *
 from .initialize import *
 from .admin import *
+from .explain import *
+from .importer import *
+from .exporter import *
+from .stats import *
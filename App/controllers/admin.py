@@ -1,9 +1,11 @@
-from App.models import Student, LeaderBoardEntry, Accolade, ActivityLog, Staff, User
-from App.database import db
+from App.models import Student, LeaderBoardEntry, Accolade, ActivityLog, Staff, User, Milestone, DataVersion, LeaderboardEvent, Job, DailyRollup
+from App.database import db, unit_of_work, commit
+from App.rankindex import rank_index
 from .initialize import initialize as initialize_schema
 from .user import create_user
 import uuid
-from sqlalchemy import desc
+from datetime import datetime, date, timedelta
+from sqlalchemy import func, or_, and_, case, cast, exists, literal, String, DateTime
 
 def initialize_full(interactive=False):
     """Initialize schema and create default users. If interactive is True,
@@ -25,10 +27,67 @@ def staff_log_hours(staff_username, student_username, hours, activity):
     student = Student.query.filter_by(username=student_username).first()
     if not staff or not student:
         return None
-    log = staff.logHoursForStudent(student.studentID, int(hours), activity)
-    db.session.commit()
+    with unit_of_work():
+        DataVersion.bump()
+        log = staff.logHoursForStudent(student.studentID, int(hours), activity)
     return log
 
+def staff_log_hours_bulk(staff_username, entries):
+    """Log hours for many students in one transaction.
+
+    `entries` is a list of dicts with `student_username`, `hours` and
+    `activity`. Usernames are resolved with a single IN query and all valid
+    rows are inserted with one executemany. Returns a dict listing the created
+    log ids and per-row errors (by index), or None if the staff member is unknown.
+    """
+    staff = Staff.query.filter_by(username=staff_username).first()
+    if not staff:
+        return None
+    usernames = {entry.get('student_username') for entry in entries
+                 if isinstance(entry, dict) and isinstance(entry.get('student_username'), str)}
+    students = dict(db.session.execute(
+        db.select(Student.username, Student.studentID).where(Student.username.in_(usernames))
+    ).all()) if usernames else {}
+
+    rows, created, errors = [], [], []
+    now = datetime.utcnow()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append({'index': index, 'error': 'Entry must be an object'})
+            continue
+        username = entry.get('student_username')
+        if not isinstance(username, str):
+            errors.append({'index': index, 'error': 'Entry requires a student_username string'})
+            continue
+        student_id = students.get(username)
+        if not student_id:
+            errors.append({'index': index, 'error': f"Student {username} not found"})
+            continue
+        try:
+            hours = int(entry['hours'])
+        except (KeyError, TypeError, ValueError):
+            hours = None
+        activity = entry.get('activity')
+        if hours is None or not isinstance(activity, str) or not activity.strip():
+            errors.append({'index': index, 'error': 'Entry requires integer hours and an activity'})
+            continue
+        log_id = str(uuid.uuid4())
+        rows.append({
+            'logID': log_id,
+            'studentID': student_id,
+            'hoursLogged': hours,
+            'dateLogged': now,
+            'status': 'logged',
+            'description': activity
+        })
+        created.append({'index': index, 'logID': log_id, 'student_username': username})
+
+    if rows:
+        db.session.execute(db.insert(ActivityLog.__table__), rows)
+        DataVersion.bump()
+        commit()
+    return {'created': created, 'errors': errors}
+
 def request_confirmation(student_username, activity_log_id):
     student = Student.query.filter_by(username=student_username).first()
     if not student:
@@ -42,25 +101,125 @@ def request_confirmation(student_username, activity_log_id):
     if not activity_log:
         return None
     # request confirmation using the resolved activity_log id
-    student.requestConfirmationOfHours(activity_log.logID)
-    db.session.commit()
+    with unit_of_work():
+        student.requestConfirmationOfHours(activity_log.logID)
     return activity_log
 
-def view_leaderboard():
-    students = Student.query.all()
-    leaderboard_data = []
-    for student in students:
-        confirmed_logs = ActivityLog.query.filter_by(studentID=student.studentID, status='confirmed').all()
-        total_confirmed_hours = sum(log.hoursLogged for log in confirmed_logs)
-        accolades_count = len(student.viewAccolades())
-        leaderboard_data.append({
-            'username': student.username,
-            'studentID': student.studentID,
-            'total_hours': total_confirmed_hours,
-            'accolades': accolades_count
-        })
-    leaderboard_data.sort(key=lambda x: x['total_hours'], reverse=True)
-    return leaderboard_data
+def _leaderboard_query():
+    """Build the grouped leaderboard statement: confirmed hours and accolade
+    counts are aggregated per student and ranked by the database."""
+    hours = (
+        db.select(ActivityLog.studentID, func.sum(ActivityLog.hoursLogged).label('total_hours'))
+        .where(ActivityLog.status == 'confirmed')
+        .group_by(ActivityLog.studentID)
+        .subquery()
+    )
+    accolades = (
+        db.select(Accolade.studentID, func.count(Accolade.accoladeID).label('accolades'))
+        .where(Accolade.studentID.isnot(None))
+        .group_by(Accolade.studentID)
+        .subquery()
+    )
+    total_hours = func.coalesce(hours.c.total_hours, 0)
+    stmt = (
+        db.select(
+            Student.username,
+            Student.studentID,
+            total_hours.label('total_hours'),
+            func.coalesce(accolades.c.accolades, 0).label('accolades')
+        )
+        .outerjoin(hours, hours.c.studentID == Student.studentID)
+        .outerjoin(accolades, accolades.c.studentID == Student.studentID)
+        .order_by(total_hours.desc(), Student.studentID)
+    )
+    return stmt, total_hours
+
+def get_data_version():
+    """Current leaderboard/accolade data version (one single-row lookup)."""
+    return DataVersion.current()
+
+def leaderboard_cursor(entry):
+    """Return the keyset cursor that resumes the leaderboard after `entry`."""
+    return f"{entry['total_hours']}:{entry['studentID']}"
+
+LEADERBOARD_WINDOWS = ('week', 'month', 'term', 'custom')
+DEFAULT_TERM_STARTS = ('01-15', '05-15', '09-01')
+
+def leaderboard_window(window, start=None, end=None, today=None, term_starts=DEFAULT_TERM_STARTS):
+    """Inclusive (first_day, last_day) of a leaderboard window ending today:
+    the current week (from Monday), calendar month or academic term (from
+    the latest of `term_starts`, given as 'MM-DD'), or `start`..`end` for
+    'custom'. Raises ValueError for an unknown window or bad custom range."""
+    today = today or datetime.utcnow().date()
+    if window == 'week':
+        return today - timedelta(days=today.weekday()), today
+    if window == 'month':
+        return today.replace(day=1), today
+    if window == 'term':
+        starts = [date(year, *map(int, term_start.split('-')))
+                  for year in (today.year - 1, today.year) for term_start in term_starts]
+        return max(start for start in starts if start <= today), today
+    if window == 'custom':
+        if start is None:
+            raise ValueError('A custom window needs a start date')
+        end = end or today
+        if start > end:
+            raise ValueError('The window start must not be after its end')
+        return start, end
+    raise ValueError(f"window must be one of {', '.join(LEADERBOARD_WINDOWS)}")
+
+def _window_leaderboard_query(first_day, last_day):
+    """Hours per student within [first_day, last_day], summed from the daily rollups."""
+    total_hours = func.sum(DailyRollup.hours)
+    stmt = (
+        db.select(Student.username, Student.studentID, total_hours.label('total_hours'))
+        .join(DailyRollup, DailyRollup.studentID == Student.studentID)
+        .where(DailyRollup.day.between(first_day, last_day))
+        .group_by(Student.studentID, Student.username)
+        .order_by(total_hours.desc(), Student.studentID)
+    )
+    return stmt, total_hours
+
+def view_leaderboard(limit=None, offset=0, cursor=None, window=None):
+    """Return leaderboard rows ordered by confirmed hours (ties by studentID).
+
+    Pages can be fetched with `limit`/`offset`, or with a keyset `cursor`
+    produced by `leaderboard_cursor()` for the last row of the previous page;
+    a malformed cursor raises ValueError.
+    With `window` as a (first_day, last_day) pair only hours logged in that
+    range count; such rows omit the all-time accolade count.
+    """
+    if window:
+        stmt, total_hours = _window_leaderboard_query(*window)
+    else:
+        stmt, total_hours = _leaderboard_query()
+    if cursor:
+        hours, separator, student_id = cursor.partition(':')
+        if not separator or not student_id:
+            raise ValueError(f'Malformed leaderboard cursor {cursor!r}')
+        hours = int(hours)
+        after = or_(
+            total_hours < hours,
+            and_(total_hours == hours, Student.studentID > student_id)
+        )
+        stmt = stmt.having(after) if window else stmt.where(after)
+    if offset:
+        stmt = stmt.offset(offset)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = []
+    for row in db.session.execute(stmt):
+        entry = {'username': row.username, 'studentID': row.studentID, 'total_hours': row.total_hours}
+        if not window:
+            entry['accolades'] = row.accolades
+        rows.append(entry)
+    return rows
+
+def rebuild_daily_rollups():
+    """Backfill the per-day rollups from the confirmed logs; returns the row count."""
+    count = DailyRollup.rebuild()
+    commit()
+    return count
 
 def view_accolades(student_username):
     student = Student.query.filter_by(username=student_username).first()
@@ -69,7 +228,7 @@ def view_accolades(student_username):
     confirmed_logs = ActivityLog.query.filter_by(studentID=student.studentID, status='confirmed').all()
     total_confirmed_hours = sum(log.hoursLogged for log in confirmed_logs)
     student.totalHours = total_confirmed_hours
-    db.session.commit()
+    commit()
     student_accolades = student.viewAccolades()
     return {'total_hours': total_confirmed_hours, 'accolades': [a.name for a in student_accolades]}
 
@@ -87,16 +246,152 @@ def staff_confirm_hours(staff_username, activity_log_id):
         return None
     if activity_log.status == 'confirmed':
         return activity_log
-    # confirm using the resolved activity_log id
-    staff.confirmHours(activity_log.logID)
-    # Update student's total hours
-    student = Student.query.filter_by(studentID=activity_log.studentID).first()
-    if student:
-        confirmed_logs = ActivityLog.query.filter_by(studentID=student.studentID, status='confirmed').all()
-        student.totalHours = sum(log.hoursLogged for log in confirmed_logs)
-        db.session.commit()
+    # confirm using the resolved activity_log id; the version bump is committed with it
+    with unit_of_work():
+        DataVersion.bump()
+        staff.confirmHours(activity_log.logID)
+        # Update student's total hours
+        student = Student.query.filter_by(studentID=activity_log.studentID).first()
+        if student:
+            confirmed_logs = ActivityLog.query.filter_by(studentID=student.studentID, status='confirmed').all()
+            student.totalHours = sum(log.hoursLogged for log in confirmed_logs)
     return activity_log
 
+def _award_milestone_accolades(student_ids=None):
+    """Award every missing milestone accolade with a single INSERT ... SELECT
+    joining students to the milestone table. Accolade ids are built in SQL the
+    way Accolade.makeID() builds them, so the statement needs no per-row Python work.
+    With `student_ids` of None the whole student body is swept."""
+    Milestone.load()  # refreshes the cache and seeds the default milestones if needed
+    student = Student.__table__
+    milestone = Milestone.__table__
+    already_awarded = exists().where(
+        Accolade.studentID == student.c.studentID,
+        Accolade.milestoneHours == milestone.c.hours
+    )
+    missing = (
+        db.select(
+            (student.c.studentID + ':' + cast(milestone.c.hours, String)).label('accoladeID'),
+            student.c.studentID,
+            milestone.c.name,
+            milestone.c.hours,
+            literal(datetime.utcnow(), DateTime).label('dateAwarded')
+        )
+        .join(milestone, student.c.totalHours >= milestone.c.hours)
+        .where(~already_awarded)
+    )
+    if student_ids is not None:
+        missing = missing.where(student.c.studentID.in_(student_ids))
+    return db.session.execute(
+        db.insert(Accolade.__table__).from_select(
+            ['accoladeID', 'studentID', 'name', 'milestoneHours', 'dateAwarded'], missing
+        )
+    ).rowcount
+
+def award_accolades():
+    """Award every missing milestone accolade across all students and refresh
+    the leaderboard accolade counts. Returns the number of accolades awarded."""
+    awarded = _award_milestone_accolades()
+    if awarded:
+        entry = LeaderBoardEntry.__table__
+        db.session.execute(
+            db.update(entry).values(
+                totalAccolades=db.select(func.count(Accolade.accoladeID))
+                    .where(Accolade.studentID == entry.c.studentID).scalar_subquery()
+            )
+        )
+        DataVersion.bump()
+    commit()
+    return awarded
+
+def _apply_confirmed_deltas(deltas):
+    """Add confirmed hours per student (`{studentID: hours}`) to the students and
+    their leaderboard entries, award milestones and re-rank the part of the
+    board they moved through."""
+    student = Student.__table__
+    db.session.execute(
+        db.update(student)
+        .where(student.c.studentID.in_(deltas))
+        .values(totalHours=student.c.totalHours + case(deltas, value=student.c.studentID, else_=0))
+    )
+    _award_milestone_accolades(list(deltas))
+    old_totals = dict(db.session.execute(
+        db.select(LeaderBoardEntry.studentID, LeaderBoardEntry.totalHours).where(LeaderBoardEntry.studentID.in_(deltas))
+    ).all())
+    missing = [student_id for student_id in deltas if student_id not in old_totals]
+    if missing:
+        db.session.execute(
+            db.insert(LeaderBoardEntry.__table__),
+            [{'entryID': str(uuid.uuid4()), 'studentID': student_id, 'rank': 0,
+              'totalHours': 0, 'totalAccolades': 0} for student_id in missing]
+        )
+    entry = LeaderBoardEntry.__table__
+    new_totals = db.session.execute(
+        db.update(entry)
+        .where(entry.c.studentID.in_(deltas))
+        .values(
+            totalHours=db.select(student.c.totalHours)
+                .where(student.c.studentID == entry.c.studentID).scalar_subquery(),
+            totalAccolades=db.select(func.count(Accolade.accoladeID))
+                .where(Accolade.studentID == entry.c.studentID).scalar_subquery()
+        )
+        .returning(entry.c.totalHours)
+    ).scalars().all()
+    # Only entries between the lowest and highest of the old and new totals can move
+    totals = [old_totals.get(student_id, 0) for student_id in deltas] + new_totals
+    LeaderBoardEntry.rerank(low=min(totals), high=max(totals))
+    LeaderboardEvent.recordEntries(list(deltas))
+
+def _review_hours_batch(staff_username, activity_log_ids, new_status):
+    """Move pending activity logs to `new_status` with one conditional UPDATE.
+    With `activity_log_ids` of None the whole pending queue is reviewed.
+    Returns the rows that actually changed as (logID, studentID, hoursLogged, dateLogged)."""
+    staff = Staff.query.filter_by(username=staff_username).first()
+    if not staff:
+        return None
+    log = ActivityLog.__table__
+    stmt = db.update(log).where(log.c.status == 'pending').values(status=new_status)
+    if activity_log_ids is not None:
+        stmt = stmt.where(log.c.logID.in_(activity_log_ids))
+    return db.session.execute(stmt.returning(log.c.logID, log.c.studentID, log.c.hoursLogged, log.c.dateLogged)).all()
+
+def staff_confirm_hours_batch(staff_username, activity_log_ids=None):
+    """Confirm many pending activity logs in one transaction.
+
+    Hour deltas are applied per student in one statement and missing
+    milestone accolades are awarded set-wise. Returns a dict with the
+    confirmed log ids and the requested ids that were not pending, or None
+    if the staff member is unknown.
+    """
+    changed = _review_hours_batch(staff_username, activity_log_ids, 'confirmed')
+    if changed is None:
+        return None
+    deltas, daily = {}, {}
+    for row in changed:
+        deltas[row.studentID] = deltas.get(row.studentID, 0) + row.hoursLogged
+        key = (row.studentID, row.dateLogged.date())
+        daily[key] = daily.get(key, 0) + row.hoursLogged
+    if deltas:
+        _apply_confirmed_deltas(deltas)
+        DailyRollup.addHours(daily)
+        DataVersion.bump()
+    commit()
+    confirmed = [row.logID for row in changed]
+    skipped = sorted(set(activity_log_ids or []) - set(confirmed))
+    return {'confirmed': confirmed, 'skipped': skipped}
+
+def staff_reject_hours_batch(staff_username, activity_log_ids=None):
+    """Reject many pending activity logs with one conditional UPDATE."""
+    changed = _review_hours_batch(staff_username, activity_log_ids, 'rejected')
+    if changed is None:
+        return None
+    if changed:
+        DataVersion.bump()
+    commit()
+    rejected = [row.logID for row in changed]
+    skipped = sorted(set(activity_log_ids or []) - set(rejected))
+    return {'rejected': rejected, 'skipped': skipped}
+
 def staff_reject_hours(staff_username, activity_log_id):
     staff = Staff.query.filter_by(username=staff_username).first()
     if not staff:
@@ -106,31 +401,65 @@ def staff_reject_hours(staff_username, activity_log_id):
         return None
     if activity_log.status != 'pending':
         return activity_log
-    staff.rejectHours(activity_log_id)
-    db.session.commit()
+    with unit_of_work():
+        DataVersion.bump()
+        staff.rejectHours(activity_log_id)
     return activity_log
 
 def update_leaderboard():
-    students = Student.query.all()
-    for student in students:
-        confirmed_logs = ActivityLog.query.filter_by(studentID=student.studentID, status='confirmed').all()
-        total_confirmed_hours = sum(log.hoursLogged for log in confirmed_logs)
-        total_accolades = len(student.viewAccolades())
-        student.totalHours = total_confirmed_hours
-        existing_entry = LeaderBoardEntry.query.filter_by(studentID=student.studentID).first()
-        if existing_entry:
-            existing_entry.updateEntry(student)
-        else:
-            new_entry = LeaderBoardEntry(
-                entryID=str(uuid.uuid4()),
-                studentID=student.studentID,
-                rank=0,
-                totalHours=total_confirmed_hours,
-                totalAccolades=total_accolades
-            )
-            db.session.add(new_entry)
-    entries = LeaderBoardEntry.query.order_by(desc(LeaderBoardEntry.totalHours)).all()
-    for rank, entry in enumerate(entries, 1):
-        entry.rank = rank
-    db.session.commit()
-    return len(entries)
+    """Rebuild every leaderboard entry from the activity logs.
+
+    Confirmations keep entries current incrementally, so this is a repair
+    operation: totals, missing entries and ranks are recomputed set-wise.
+    """
+    confirmed_hours = (
+        db.select(func.coalesce(func.sum(ActivityLog.hoursLogged), 0))
+        .where(ActivityLog.studentID == Student.studentID, ActivityLog.status == 'confirmed')
+        .scalar_subquery()
+    )
+    db.session.execute(
+        db.update(Student.__table__).values(totalHours=confirmed_hours.correlate(Student.__table__)),
+    )
+    missing = db.session.scalars(
+        db.select(Student.studentID)
+        .outerjoin(LeaderBoardEntry, LeaderBoardEntry.studentID == Student.studentID)
+        .where(LeaderBoardEntry.entryID.is_(None))
+    ).all()
+    if missing:
+        db.session.execute(
+            db.insert(LeaderBoardEntry),
+            [{'entryID': str(uuid.uuid4()), 'studentID': student_id, 'rank': 0,
+              'totalHours': 0, 'totalAccolades': 0} for student_id in missing]
+        )
+    student_hours = (
+        db.select(Student.__table__.c.totalHours)
+        .where(Student.__table__.c.studentID == LeaderBoardEntry.studentID)
+        .scalar_subquery()
+    )
+    accolade_count = (
+        db.select(func.count(Accolade.accoladeID))
+        .where(Accolade.studentID == LeaderBoardEntry.studentID)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        db.update(LeaderBoardEntry)
+        .values(totalHours=student_hours, totalAccolades=accolade_count),
+        execution_options={'synchronize_session': False}
+    )
+    LeaderBoardEntry.rerank()
+    DailyRollup.rebuild()
+    LeaderboardEvent.recordRebuild()
+    DataVersion.bump()
+    commit()
+    return db.session.scalar(db.select(func.count(LeaderBoardEntry.entryID)))
+
+def get_job(job_id):
+    return db.session.get(Job, job_id)
+
+def student_rank(student_username, k=0, mode='competition'):
+    """A student's current rank and the k students above and below, served
+    from this process's rank index. None if unknown or not on the board."""
+    student_id = db.session.scalar(db.select(Student.studentID).filter_by(username=student_username))
+    if not student_id:
+        return None
+    return rank_index.lookup(student_id, k, mode)
@@ -1,14 +1,22 @@
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, g, has_request_context
 from flask_jwt_extended import create_access_token, current_user, jwt_required, JWTManager, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from App.models import User
-from App.database import db
+from App.database import db, commit
+from App.cache import user_cache
+from App.hashing import needs_rehash
 
 def login(username, password, user_type=None):
   result = db.session.execute(db.select(User).filter_by(username=username))
   user = result.scalar_one_or_none()
   if user and user.check_password(password):
+    if needs_rehash(user.password):
+        # Upgrade hashes made with outdated method or cost settings
+        user.set_password(password)
+        commit()
     if user_type is None or user.user_type == user_type:
         # Store ONLY the user id as a string in JWT 'sub'
         return create_access_token(identity=str(user.userID))
@@ -29,8 +37,52 @@ def login_required(required_class):
     return decorated_function
   return decorator 
 
+def _detached_copy(user):
+  # Copy the loaded column values into a fresh detached instance so the cached
+  # object never shares state with (or expires along with) a request session
+  mapper = inspect(user).mapper
+  copy = mapper.class_manager.new_instance()
+  for attr in mapper.column_attrs:
+    setattr(copy, attr.key, getattr(user, attr.key))
+  make_transient_to_detached(copy)
+  return copy
+
+def get_cached_user(identity):
+  """Return the User for a JWT identity, looking it up at most once per request
+  and serving repeat requests from the per-process TTL cache."""
+  if identity is None:
+    return None
+  per_request = g.setdefault('_user_lookups', {}) if has_request_context() else {}
+  if identity in per_request:
+    return per_request[identity]
+  cached = user_cache.get(identity)
+  if cached is not None:
+    # Attach a copy of the snapshot to this request's session without a query
+    user = db.session.merge(cached, load=False)
+  else:
+    user = db.session.get(User, identity)
+    if user is not None:
+      user_cache.set(identity, _detached_copy(user))
+  per_request[identity] = user
+  return user
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_cached_users(session, flush_context):
+  # Any flushed change to a user (rename, password change, type conversion,
+  # delete) evicts its cached snapshot
+  for obj in list(session.dirty) + list(session.deleted):
+    if isinstance(obj, User):
+      user_cache.invalidate(obj.userID)
+
 def setup_jwt(app):
   jwt = JWTManager(app)
+  user_cache.configure(maxsize=app.config['USER_CACHE_SIZE'], ttl=app.config['USER_CACHE_TTL'])
+
+  # The app context (and so `g`) can outlive a request, so start every
+  # request with an empty lookup memo
+  @app.before_request
+  def reset_user_lookups():
+    g.pop('_user_lookups', None)
 
   # Always store a string user id in the JWT identity (sub),
   # whether a User object or a raw id is passed.
@@ -43,7 +95,7 @@ def setup_jwt(app):
   def user_lookup_callback(_jwt_header, jwt_data):
     identity = jwt_data["sub"]
     # Use string userID for lookup
-    return db.session.get(User, identity)
+    return get_cached_user(identity)
 
   return jwt
 
@@ -55,7 +107,7 @@ def add_auth_context(app):
       try:
           verify_jwt_in_request()
           identity = get_jwt_identity()
-          current_user = db.session.get(User, identity) if identity is not None else None
+          current_user = get_cached_user(identity)
           is_authenticated = current_user is not None
       except Exception as e:
           print(e)
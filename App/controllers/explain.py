@@ -0,0 +1,60 @@
+from sqlalchemy import text
+
+from App.models import Student, LeaderBoardEntry, Accolade, ActivityLog, User
+from App.database import db
+from .admin import _leaderboard_query
+
+SAMPLE_ID = '00000000-0000-0000-0000-000000000000'
+
+def _controller_queries():
+    """Representative statements issued by the controllers, keyed by a short name."""
+    return [
+        ('login: user by username',
+         db.select(User).filter_by(username='bob')),
+        ('view_leaderboard: grouped totals',
+         _leaderboard_query()[0]),
+        ('view_accolades: confirmed logs for student',
+         db.select(ActivityLog.hoursLogged).filter_by(studentID=SAMPLE_ID, status='confirmed')),
+        ('request_confirmation: latest logged entry',
+         db.select(ActivityLog).filter_by(studentID=SAMPLE_ID, status='logged')
+         .order_by(ActivityLog.dateLogged.desc()).limit(1)),
+        ('staff_confirm_hours: latest pending entry',
+         db.select(ActivityLog).filter_by(status='pending')
+         .order_by(ActivityLog.dateLogged.desc()).limit(1)),
+        ('award_accolades: accolade for milestone',
+         db.select(Accolade).filter_by(studentID=SAMPLE_ID, milestoneHours=10)),
+        ('viewAccolades: accolades for student',
+         db.select(Accolade).filter_by(studentID=SAMPLE_ID)),
+        ('updateEntry: leaderboard entry for student',
+         db.select(LeaderBoardEntry).filter_by(studentID=SAMPLE_ID)),
+        ('updateEntry: first entry behind new position',
+         db.select(LeaderBoardEntry.rank)
+         .where(LeaderBoardEntry.studentID != SAMPLE_ID, LeaderBoardEntry._behind(10, SAMPLE_ID))
+         .order_by(LeaderBoardEntry.rank).limit(1)),
+        ('view_leaderboard: entries by hours',
+         db.select(LeaderBoardEntry).order_by(LeaderBoardEntry.totalHours.desc()).limit(10)),
+        ('staff_log_hours_bulk: resolve usernames',
+         db.select(Student.username, Student.studentID).where(Student.username.in_(['bob', 'sally']))),
+    ]
+
+def _is_full_scan(dialect, line):
+    if dialect == 'sqlite':
+        # "SCAN table" without "USING ... INDEX" reads every row
+        return line.lstrip(' |-`').startswith('SCAN') and 'INDEX' not in line
+    return 'Seq Scan' in line
+
+def explain_queries():
+    """Return [(name, sql, plan_lines, full_scan)] for every controller query
+    using the database's own EXPLAIN output (SQLite or Postgres)."""
+    engine = db.engine
+    dialect = engine.dialect.name
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    results = []
+    for name, stmt in _controller_queries():
+        sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+        rows = db.session.execute(text(prefix + sql)).all()
+        # SQLite returns (id, parent, notused, detail); Postgres one text column
+        lines = [row[-1] for row in rows]
+        full_scan = any(_is_full_scan(dialect, line) for line in lines)
+        results.append((name, sql, lines, full_scan))
+    return results
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from App.models import User, ActivityLog, LeaderBoardEntry
+from App.database import db
+from .importer import LOG_STATUSES
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+ACTIVITY_LOG_COLUMNS = ('logID', 'username', 'studentID', 'hoursLogged', 'dateLogged', 'status', 'description')
+LEADERBOARD_COLUMNS = ('rank', 'username', 'studentID', 'totalHours', 'totalAccolades')
+
+
+def _stream_rows(stmt, batch_size):
+    # A dedicated connection with a server-side cursor: rows arrive in batches
+    # and the read transaction ends as soon as the export finishes, without
+    # touching (or being held open by) the caller's session
+    with db.engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+        for row in result.mappings():
+            yield dict(row)
+
+
+def iter_activity_logs(status=None, since=None, until=None, batch_size=1000):
+    """Yield every activity log as a dict with its student's username,
+    oldest first, optionally filtered by status and a [since, until) date range."""
+    if status is not None and status not in LOG_STATUSES:
+        raise ValueError(f'Unknown status {status}')
+    stmt = (
+        db.select(ActivityLog.logID, User.username, ActivityLog.studentID, ActivityLog.hoursLogged,
+                  ActivityLog.dateLogged, ActivityLog.status, ActivityLog.description)
+        .join(User, User.userID == ActivityLog.studentID)
+        .order_by(ActivityLog.dateLogged, ActivityLog.logID)
+    )
+    if status is not None:
+        stmt = stmt.where(ActivityLog.status == status)
+    if since is not None:
+        stmt = stmt.where(ActivityLog.dateLogged >= since)
+    if until is not None:
+        stmt = stmt.where(ActivityLog.dateLogged < until)
+    return _stream_rows(stmt, batch_size)
+
+
+def iter_leaderboard(batch_size=1000):
+    """Yield every leaderboard entry with its student's username in rank order."""
+    stmt = (
+        db.select(LeaderBoardEntry.rank, User.username, LeaderBoardEntry.studentID,
+                  LeaderBoardEntry.totalHours, LeaderBoardEntry.totalAccolades)
+        .join(User, User.userID == LeaderBoardEntry.studentID)
+        .order_by(LeaderBoardEntry.rank)
+    )
+    return _stream_rows(stmt, batch_size)
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def format_export(rows, columns, fmt='csv'):
+    """Serialize row dicts lazily, yielding one CSV (with a header first) or
+    JSONL line at a time."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format {fmt}')
+    if fmt == 'jsonl':
+        for row in rows:
+            yield json.dumps({column: _export_value(row[column]) for column in columns}) + '\n'
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_export_value(row[column]) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when there were no rows
+    if buffer.getvalue():
+        yield buffer.getvalue()
@@ -0,0 +1,202 @@
+import csv
+import io
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+
+from App.models import User, Student, Staff, ActivityLog, LeaderBoardEntry, DataVersion, ImportCheckpoint
+from App.database import db
+from App.hashing import hash_passwords
+from .admin import update_leaderboard, award_accolades
+
+LOG_STATUSES = ('logged', 'pending', 'confirmed', 'rejected')
+# Per-row errors kept in the result; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_records(path, fmt=None):
+    """Yield one dict per CSV row or JSONL line of `path` without loading the
+    whole file. `fmt` ('csv' or 'jsonl') defaults to the file extension."""
+    if fmt is None:
+        fmt = 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _insert_rows(table, rows):
+    """Insert `rows` (dicts) into `table`: COPY on Postgres, executemany elsewhere."""
+    if not rows:
+        return
+    if db.session.get_bind().dialect.name != 'postgresql':
+        db.session.execute(db.insert(table), rows)
+        return
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        cursor.copy_expert(f'COPY "{table.name}" ({column_list}) FROM STDIN WITH CSV', buffer)
+    finally:
+        cursor.close()
+
+
+def _import_user_chunk(records, user_type):
+    by_username = {}
+    errors = []
+    for line, record in records:
+        username = record.get('username')
+        username = username.strip() if isinstance(username, str) else ''
+        secrets = [record.get('password'), record.get('password_hash')]
+        if (not username or not any(secrets)
+                or not all(secret is None or isinstance(secret, str) for secret in secrets)):
+            errors.append({'line': line, 'error': 'Row requires a username and a password'})
+        elif username not in by_username:
+            by_username[username] = record
+    existing = set(db.session.scalars(
+        db.select(User.username).where(User.username.in_(list(by_username)))
+    )) if by_username else set()
+    new = [(username, record) for username, record in by_username.items() if username not in existing]
+
+    to_hash = [record['password'] for _, record in new if not record.get('password_hash')]
+    hashed = iter(hash_passwords(to_hash))
+    users, subtype_rows = [], []
+    for username, record in new:
+        user_id = str(uuid.uuid4())
+        users.append({
+            'userID': user_id,
+            'username': username,
+            'password': record.get('password_hash') or next(hashed),
+            'user_type': user_type
+        })
+        if user_type == 'student':
+            subtype_rows.append({'studentID': user_id, 'totalHours': 0, 'points': 0})
+        else:
+            subtype_rows.append({'staffID': user_id})
+    _insert_rows(User.__table__, users)
+    _insert_rows((Student if user_type == 'student' else Staff).__table__, subtype_rows)
+    if user_type == 'student' and subtype_rows:
+        LeaderBoardEntry.addStudents([row['studentID'] for row in subtype_rows])
+        DataVersion.bump()
+    return len(users), errors
+
+
+def _import_log_chunk(records):
+    # Check every row up front, so a bad value is reported against its line
+    # instead of failing (and, on every resume, refailing) the whole chunk
+    valid, errors = [], []
+    now = datetime.utcnow()
+    for line, record in records:
+        try:
+            hours = int(record['hours'])
+            description = record.get('activity') or record['description']
+            status = record.get('status') or 'logged'
+            date = datetime.fromisoformat(record['date']) if record.get('date') else now
+        except (KeyError, TypeError, ValueError):
+            errors.append({'line': line, 'error': 'Row requires integer hours, an activity and an ISO date if given'})
+            continue
+        username, log_id = record.get('student_username'), record.get('logID') or None
+        if not all(isinstance(value, str) for value in (username, description, status)) \
+                or not isinstance(log_id, (str, type(None))):
+            errors.append({'line': line, 'error': 'Student username, activity, status and logID must be text'})
+        elif status not in LOG_STATUSES:
+            errors.append({'line': line, 'error': f'Unknown status {status}'})
+        else:
+            valid.append((line, username, log_id, hours, description, status, date))
+
+    usernames = {username for _, username, *_ in valid}
+    students = dict(db.session.execute(
+        db.select(Student.username, Student.studentID).where(Student.username.in_(usernames))
+    ).all()) if usernames else {}
+    supplied = [log_id for _, _, log_id, *_ in valid if log_id]
+    taken = set(db.session.scalars(
+        db.select(ActivityLog.logID).where(ActivityLog.logID.in_(supplied))
+    )) if supplied else set()
+    rows = []
+    for line, username, log_id, hours, description, status, date in valid:
+        student_id = students.get(username)
+        if not student_id:
+            errors.append({'line': line, 'error': f'Student {username} not found'})
+            continue
+        if log_id in taken:
+            errors.append({'line': line, 'error': f'Log {log_id} already exists'})
+            continue
+        if log_id:
+            taken.add(log_id)
+        rows.append({
+            'logID': log_id or str(uuid.uuid4()),
+            'studentID': student_id,
+            'hoursLogged': hours,
+            'dateLogged': date,
+            'status': status,
+            'description': description
+        })
+    _insert_rows(ActivityLog.__table__, rows)
+    errors.sort(key=lambda error: error['line'])
+    return len(rows), errors
+
+
+def import_records(kind, path, fmt=None, batch_size=1000, restart=False, progress=None):
+    """Import 'students', 'staff' or 'logs' from a CSV/JSONL file.
+
+    Rows are read lazily and handled in chunks of `batch_size`: usernames are
+    resolved with one IN query per chunk and the chunk is inserted and
+    committed at once (COPY on Postgres). Progress is saved as an
+    ImportCheckpoint in the same transaction as each chunk, so a rerun after
+    a failure resumes where the last one stopped unless `restart` is set. Existing
+    usernames are skipped. `progress`, if given, is called with the result
+    dict after each chunk.
+
+    Returns {'rows', 'created', 'errors', 'error_count', 'resumed_from', 'seconds'}.
+    """
+    if kind not in ('students', 'staff', 'logs'):
+        raise ValueError(f'Unknown import kind {kind}')
+    path = os.path.abspath(path)
+    start_row = 0 if restart else ImportCheckpoint.read(path, kind)
+    result = {'rows': start_row, 'created': 0, 'errors': [], 'error_count': 0,
+              'resumed_from': start_row, 'seconds': 0.0}
+    started = time.perf_counter()
+    # Line numbers count data rows from 1, matching the checkpoint's row count
+    records = enumerate(islice(read_records(path, fmt), start_row, None), start_row + 1)
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            break
+        try:
+            if kind == 'logs':
+                created, errors = _import_log_chunk(chunk)
+            else:
+                created, errors = _import_user_chunk(chunk, 'student' if kind == 'students' else 'staff')
+            ImportCheckpoint.save(path, kind, result['rows'] + len(chunk))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        result['rows'] += len(chunk)
+        result['created'] += created
+        result['error_count'] += len(errors)
+        result['errors'].extend(errors[:MAX_REPORTED_ERRORS - len(result['errors'])])
+        result['seconds'] = time.perf_counter() - started
+        if progress:
+            progress(result)
+
+    if kind == 'logs' and (result['created'] or start_row):
+        # Imported logs may carry confirmed hours: recompute totals, ranks and
+        # accolades (also on a resumed run, in case the failed one stopped before this)
+        update_leaderboard()
+        award_accolades()
+    ImportCheckpoint.clear(path)
+    db.session.commit()
+    result['seconds'] = time.perf_counter() - started
+    return result
@@ -0,0 +1,107 @@
+from sqlalchemy import String, cast, func
+
+from App.models import Student, ActivityLog, Milestone, DataVersion
+from App.database import db
+from App.cache import stats_cache
+
+PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+SECONDS_PER_DAY = 86400
+
+
+def _confirmed_hours_columns():
+    """Every confirmed log as parallel NumPy arrays (student number, hours,
+    epoch seconds), grouped by student and oldest first. The database joins
+    each student's hours and dates into one string apiece, so a million logs
+    reach Python as one row per student and NumPy parses them in bulk."""
+    # NumPy is imported on first use so it stays out of app startup
+    import numpy as np
+    # A range scan of the covering ix_activity_log_status_student, already grouped
+    stmt = (
+        db.select(func.count(),
+                  func.aggregate_strings(cast(ActivityLog.hoursLogged, String), ','),
+                  func.aggregate_strings(cast(ActivityLog.dateLogged, String), ','))
+        .where(ActivityLog.status == 'confirmed')
+        .group_by(ActivityLog.studentID)
+    )
+    with db.engine.connect() as conn:
+        rows = conn.execute(stmt).all()
+    if not rows:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    counts, hours, dates = zip(*rows)
+    students = np.repeat(np.arange(len(rows), dtype=np.int64), counts)
+    hours = np.fromstring(','.join(hours), dtype=np.int64, sep=',')
+    seconds = np.array(','.join(dates).split(','), dtype='datetime64[s]').astype(np.int64)
+    # The index returns each student's logs oldest first, but aggregates don't
+    # promise to keep that order, so sort whenever they didn't
+    if np.any((np.diff(seconds) < 0) & (np.diff(students) == 0)):
+        order = np.lexsort((seconds, students))
+        hours, seconds = hours[order], seconds[order]
+    return students, hours, seconds
+
+
+def summarize_hours(students, hours, seconds, student_count, milestones):
+    """Aggregate confirmed logs (grouped by student, oldest first) into the
+    hours report. `student_count` includes students with no confirmed hours;
+    `milestones` are (hours, name) pairs in ascending order."""
+    import numpy as np
+    if len(hours):
+        starts = np.flatnonzero(np.r_[True, students[1:] != students[:-1]])
+        sizes = np.diff(np.r_[starts, len(hours)])
+        logged_totals = np.add.reduceat(hours, starts)
+    else:
+        starts = sizes = logged_totals = np.array([], dtype=np.int64)
+    totals = np.zeros(max(student_count, len(starts)), dtype=np.int64)
+    totals[:len(logged_totals)] = logged_totals
+
+    thresholds = np.array([hours for hours, _ in milestones], dtype=np.int64)
+    # Bucket i holds totals in [thresholds[i-1], thresholds[i]); the last one is open-ended
+    buckets = np.bincount(np.searchsorted(thresholds, totals, side='right'), minlength=len(thresholds) + 1)
+    reached = np.cumsum(buckets[::-1])[::-1][1:]
+    edges = np.r_[0, thresholds]
+    histogram = [
+        {'from': int(edges[i]), 'to': int(edges[i + 1]) - 1 if i < len(thresholds) else None,
+         'students': int(buckets[i])}
+        for i in range(len(buckets))
+    ]
+
+    # Running total within each student's own logs, and when they first logged
+    running = np.cumsum(hours)
+    within = running - np.repeat(running[starts] - hours[starts], sizes)
+    first_logged = np.repeat(seconds[starts], sizes)
+    milestone_stats = []
+    for (threshold, name), count in zip(milestones, reached):
+        crossed = (within >= threshold) & (within - hours < threshold)
+        days = (seconds[crossed] - first_logged[crossed]) / SECONDS_PER_DAY
+        milestone_stats.append({
+            'hours': threshold, 'name': name, 'students': int(count),
+            'share': round(float(count) / len(totals), 4) if len(totals) else 0.0,
+            'median_days_to_reach': round(float(np.median(days)), 2) if len(days) else None
+        })
+
+    percentiles = np.percentile(totals, PERCENTILES) if len(totals) else [None] * len(PERCENTILES)
+    return {
+        'students': len(totals),
+        'confirmed_logs': len(hours),
+        'total_hours': int(totals.sum()),
+        'mean_hours': round(float(totals.mean()), 2) if len(totals) else None,
+        'percentiles': {f'p{p}': None if value is None else round(float(value), 2)
+                        for p, value in zip(PERCENTILES, percentiles)},
+        'histogram': histogram,
+        'milestones': milestone_stats
+    }
+
+
+def hours_stats():
+    """Distribution of confirmed hours across students: percentiles, a
+    histogram bucketed at the milestones, and per milestone the share of
+    students past it and the median days from first confirmed log to reach
+    it. Cached until the data version changes."""
+    version = DataVersion.current()
+    cached = stats_cache.get(('hours', version))
+    if cached is not None:
+        return cached
+    student_count = db.session.scalar(db.select(func.count()).select_from(Student))
+    stats = summarize_hours(*_confirmed_hours_columns(), student_count, Milestone.thresholds())
+    stats['data_version'] = version
+    stats_cache.set(('hours', version), stats)
+    return stats
@@ -1,5 +1,6 @@
-from App.models import User, Student, Staff
-from App.database import db
+from App.models import User, Student, Staff, LeaderBoardEntry, DataVersion
+from App.database import db, commit, rollback
+from App.hashing import hash_passwords
 from sqlalchemy import insert
 
 def create_user(username, password, user_type=None):
@@ -17,13 +18,44 @@ def create_user(username, password, user_type=None):
         newuser = User(username=username, password=password)
     try: 
         db.session.add(newuser)
-        db.session.commit()
+        if user_type == 'student':
+            db.session.flush()
+            LeaderBoardEntry.addStudents([newuser.studentID])
+            DataVersion.bump()
+        commit()
         return newuser
     except Exception as e:
-        db.session.rollback()
+        rollback()
         print(f"Error creating user: {e}")
         return None
 
+def create_users(entries, user_type=None):
+    """Create many users from (username, password) pairs in one transaction.
+
+    Existing usernames are skipped (resolved with one IN query) and the new
+    passwords are hashed in parallel across cores. Returns the created users.
+    """
+    entries = list(dict(entries).items())
+    existing = set(db.session.scalars(
+        db.select(User.username).where(User.username.in_([username for username, _ in entries]))
+    )) if entries else set()
+    entries = [(username, password) for username, password in entries if username not in existing]
+    hashes = hash_passwords(password for _, password in entries)
+    model = {'student': Student, 'staff': Staff}.get(user_type, User)
+    users = [model(username, None, password_hash=pwhash) for (username, _), pwhash in zip(entries, hashes)]
+    try:
+        db.session.add_all(users)
+        if model is Student and users:
+            db.session.flush()
+            LeaderBoardEntry.addStudents([user.studentID for user in users])
+            DataVersion.bump()
+        commit()
+        return users
+    except Exception as e:
+        rollback()
+        print(f"Error creating users: {e}")
+        return []
+
 def create_staff(username, password):
     existing = get_user_by_username(username)
     if existing:
@@ -34,21 +66,21 @@ def create_staff(username, password):
         try:
             db.session.execute(insert(Staff.__table__).values(staffID=existing.userID))
             existing.user_type = 'staff'
-            db.session.commit()
+            commit()
             # Return the user as a Staff instance
             return db.session.get(User, existing.userID)
         except Exception as e:
-            db.session.rollback()
+            rollback()
             print(f"Error converting existing user to staff: {e}")
             return None
     # No existing user, create new staff
     newstaff = Staff(username=username, password=password)
     try:
         db.session.add(newstaff)
-        db.session.commit()
+        commit()
         return newstaff
     except Exception as e:
-        db.session.rollback()
+        rollback()
         print(f"Error creating staff user: {e}")
         return None
 
@@ -61,19 +93,24 @@ def create_student(username, password):
         try:
             db.session.execute(insert(Student.__table__).values(studentID=existing.userID, totalHours=0, points=0))
             existing.user_type = 'student'
-            db.session.commit()
+            LeaderBoardEntry.addStudents([existing.userID])
+            DataVersion.bump()
+            commit()
             return db.session.get(User, existing.userID)
         except Exception as e:
-            db.session.rollback()
+            rollback()
             print(f"Error converting existing user to student: {e}")
             return None
     newstudent = Student(username=username, password=password)
     try:
         db.session.add(newstudent)
-        db.session.commit()
+        db.session.flush()
+        LeaderBoardEntry.addStudents([newstudent.studentID])
+        DataVersion.bump()
+        commit()
         return newstudent
     except Exception as e:
-        db.session.rollback()
+        rollback()
         print(f"Error creating student user: {e}")              
         return None
 
@@ -87,18 +124,43 @@ def get_user(id):
 def get_all_users():
     return db.session.scalars(db.select(User)).all()
 
+def iter_users_json(batch_size=1000):
+    """Yield {'id', 'username'} dicts for every user, streamed from a
+    server-side cursor in batches so memory stays flat."""
+    stmt = db.select(User.userID, User.username).order_by(User.username)
+    for row in db.session.execute(stmt, execution_options={'yield_per': batch_size}):
+        yield {'id': row.userID, 'username': row.username}
+
 def get_all_users_json():
-    users = get_all_users()
-    if not users:
-        return []
-    users = [user.get_json() for user in users]
-    return users
+    return list(iter_users_json())
+
+USER_ORDER_COLUMNS = {'username': User.username, 'id': User.userID}
+
+def get_users_page(limit=50, after=None, order='username'):
+    """Return one keyset page of users as (users_json, next_cursor).
+
+    Users are ordered by `order` ('username' or 'id'); pass the returned
+    cursor as `after` to fetch the following page. next_cursor is None on the
+    last page.
+    """
+    column = USER_ORDER_COLUMNS[order]
+    stmt = db.select(User.userID, User.username).order_by(column).limit(limit + 1)
+    if after is not None:
+        stmt = stmt.where(column > after)
+    rows = db.session.execute(stmt).all()
+    users = [{'id': row.userID, 'username': row.username} for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = users[-1]['username' if order == 'username' else 'id']
+    return users, next_cursor
 
 def update_user(id, username):
     user = get_user(id)
     if user:
         user.username = username
         # user is already in the session; no need to re-add
-        db.session.commit()
+        # Usernames appear on the leaderboard and in cached responses
+        DataVersion.bump()
+        commit()
         return True
     return None
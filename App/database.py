@@ -1,14 +1,237 @@
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import make_response
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
 
 db = SQLAlchemy()
 
+class _UnitOfWork:
+    def __init__(self):
+        self.doomed = False
+
+# The unit of work open in the current context, if any
+_current_unit = ContextVar('unit_of_work', default=None)
+
+@contextmanager
+def unit_of_work():
+    """Run a block of writes as one transaction. Inside it, model methods and
+    controllers that call commit() only flush, and the outermost block
+    commits once on exit, or rolls back if it raised or anything in it
+    called rollback(). Nested blocks join the enclosing one."""
+    if _current_unit.get() is not None:
+        yield db.session
+        return
+    unit = _UnitOfWork()
+    token = _current_unit.set(unit)
+    try:
+        yield db.session
+        if unit.doomed:
+            db.session.rollback()
+        else:
+            db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        raise
+    finally:
+        _current_unit.reset(token)
+
+def commit():
+    """Commit the session, or inside a unit_of_work() just flush it."""
+    if _current_unit.get() is None:
+        db.session.commit()
+    else:
+        db.session.flush()
+
+def rollback():
+    """Roll back the session. Inside a unit_of_work() this discards the
+    whole unit, so nothing written in it is committed."""
+    db.session.rollback()
+    unit = _current_unit.get()
+    if unit is not None:
+        unit.doomed = True
+
+@contextmanager
+def independent_session():
+    """A short-lived session on a connection of its own that commits on
+    exit, for bookkeeping (e.g. job status) that must be durable at once even
+    while db.session is inside a unit_of_work(). Objects it returns stay
+    loaded but are detached from db.session."""
+    session = Session(db.engine, expire_on_commit=False)
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def on_commit(callback):
+    """Call `callback` after the current transaction of db.session commits,
+    which inside a unit_of_work() is the unit's final commit. It is dropped
+    if the transaction rolls back. Register before calling commit()."""
+    db.session.info.setdefault('on_commit', []).append(callback)
+
+@event.listens_for(Session, 'after_commit')
+def _run_on_commit(session):
+    for callback in session.info.pop('on_commit', ()):
+        callback()
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_on_commit(session):
+    session.info.pop('on_commit', None)
+
+def in_unit_of_work(view):
+    """Run a view in its own unit_of_work(); error responses roll it back."""
+    @wraps(view)
+    def decorated_view(*args, **kwargs):
+        with unit_of_work():
+            response = make_response(view(*args, **kwargs))
+            if response.status_code >= 400:
+                rollback()
+        return response
+    return decorated_view
+
+def setup_unit_of_work(app):
+    """With UNIT_OF_WORK_PER_REQUEST, wrap every view registered so far in
+    in_unit_of_work(), making each request one all-or-nothing transaction."""
+    if not app.config['UNIT_OF_WORK_PER_REQUEST']:
+        return
+    for endpoint, view in app.view_functions.items():
+        if endpoint != 'static':
+            app.view_functions[endpoint] = in_unit_of_work(view)
+
 def get_migrate(app):
+    # Alembic is heavy to import and only the `flask db` commands need it
+    from flask_migrate import Migrate
     return Migrate(app, db)
 
+def dialect_insert(table):
+    """The current database's own INSERT construct, which supports ON CONFLICT."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def insert_ignore(table):
+    """INSERT that silently skips rows violating a unique constraint."""
+    return dialect_insert(table).on_conflict_do_nothing()
+
 def create_db():
     db.create_all()
-    
+
+# PRAGMA applied to every new SQLite connection -> config key holding its value
+# (a value of None leaves SQLite's default in place)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'SQLITE_JOURNAL_MODE',
+    'synchronous': 'SQLITE_SYNCHRONOUS',
+    'busy_timeout': 'SQLITE_BUSY_TIMEOUT',
+    'mmap_size': 'SQLITE_MMAP_SIZE',
+    'cache_size': 'SQLITE_CACHE_SIZE',
+    'temp_store': 'SQLITE_TEMP_STORE'
+}
+
+def configure_sqlite(engine, config):
+    """Apply the configured pragmas on connect. WAL lets readers proceed while
+    a write is in progress, and busy_timeout makes a blocked writer wait for
+    the lock instead of failing straight away with "database is locked"."""
+    pragmas = [(name, config[key]) for name, key in SQLITE_PRAGMAS.items() if config.get(key) is not None]
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+SQLITE_CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+def sqlite_maintenance(checkpoint_mode='TRUNCATE', vacuum=False):
+    """Checkpoint the WAL into the main database file, refresh the query
+    planner's statistics (PRAGMA optimize) and optionally VACUUM. Returns the
+    checkpoint's (busy, log pages, checkpointed pages)."""
+    if checkpoint_mode not in SQLITE_CHECKPOINT_MODES:
+        raise ValueError(f'Unknown checkpoint mode {checkpoint_mode}')
+    # VACUUM and a full checkpoint cannot run inside a transaction
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        busy, log, checkpointed = conn.exec_driver_sql(f'PRAGMA wal_checkpoint({checkpoint_mode})').one()
+        conn.exec_driver_sql('PRAGMA optimize')
+        if vacuum:
+            conn.exec_driver_sql('VACUUM')
+    return busy, log, checkpointed
+
+def gevent_wait_callback(conn, timeout=None):
+    """psycopg2 wait callback that yields to the gevent hub while the server
+    works, instead of blocking the whole worker on the socket."""
+    from psycopg2 import extensions, OperationalError
+    from gevent.socket import wait_read, wait_write
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f'Bad result from poll: {state}')
+
+def make_psycopg2_cooperative():
+    """Install gevent_wait_callback when running in a monkey-patched gevent
+    worker with psycopg2 available. Returns whether it was installed."""
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is None or not monkey.is_module_patched('socket'):
+        return False
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return False
+    extensions.set_wait_callback(gevent_wait_callback)
+    return True
+
+def engine_options(config):
+    """Pool settings for a server database, sized so that every worker
+    process together stays within DB_MAX_CONNECTIONS. A worker never needs
+    more connections than it has greenlets, and keeps half of its share warm
+    in the pool with the rest as overflow. Options already set in
+    SQLALCHEMY_ENGINE_OPTIONS take precedence."""
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if str(config.get('SQLALCHEMY_DATABASE_URI', '')).startswith('sqlite'):
+        return options
+    per_worker = max(2, min(config['WORKER_CONNECTIONS'], config['DB_MAX_CONNECTIONS'] // max(1, config['WEB_WORKERS'])))
+    options.setdefault('pool_size', per_worker // 2)
+    options.setdefault('max_overflow', per_worker - per_worker // 2)
+    options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+    options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+    options.setdefault('pool_pre_ping', True)
+    return options
+
+def dispose_engines(app):
+    """Drop this process's pooled connections without closing them. Called
+    in each forked worker so connections opened in the preloading master are
+    left to it and never shared across processes."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def pool_stats():
+    """Connection counts of this process's engine pool."""
+    pool = db.engine.pool
+    stats = {'class': type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
+
 def init_db(app):
-    db.init_app(app)
\ No newline at end of file
+    db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            configure_sqlite(db.engine, app.config)
\ No newline at end of file
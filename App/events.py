@@ -0,0 +1,143 @@
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from App.database import db
+from App.models import LeaderboardEvent
+
+
+class LeaderboardBroadcaster:
+    """Fans leaderboard events out to the SSE connections of one worker.
+
+    A single background poller per process tails the LeaderboardEvent table
+    (so changes made by any worker are seen) and copies each new event into
+    every subscriber's queue. Under gevent the poller and the waiting
+    connections are greenlets, so thousands of idle streams cost one query
+    per poll interval in total.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+        self.last_event_id = None
+        self._seen = {}  # eventID -> created, for events inside the overlap window
+
+    def subscribe(self, app):
+        subscriber = queue.Queue(maxsize=app.config['LEADERBOARD_STREAM_QUEUE_SIZE'])
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                self._app = app
+                self._thread = threading.Thread(target=self._run, name='leaderboard-broadcaster', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        """Deliver one event dict to every subscriber. A subscriber that has
+        fallen too far behind is sent a rebuild marker instead."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait({'id': event['id'], 'type': 'rebuild'})
+
+    def poll_once(self):
+        """Publish events recorded since the last poll, including late ones
+        (see LeaderboardEvent.since); returns how many."""
+        overlap = current_app.config['LEADERBOARD_EVENT_OVERLAP']
+        window_start = datetime.utcnow() - timedelta(seconds=overlap)
+        if self.last_event_id is None:
+            self.last_event_id = db.session.scalar(db.select(db.func.max(LeaderboardEvent.eventID))) or 0
+            self._seen = dict(db.session.execute(
+                db.select(LeaderboardEvent.eventID, LeaderboardEvent.created)
+                .where(LeaderboardEvent.created >= window_start)
+            ).all())
+            return 0
+        events = LeaderboardEvent.since(self.last_event_id, self._seen, overlap, limit=500)
+        for event in events:
+            self.publish({'id': event.eventID, **event.to_json()})
+            self._seen[event.eventID] = event.created
+            self.last_event_id = max(self.last_event_id, event.eventID)
+        self._seen = {event_id: created for event_id, created in self._seen.items() if created >= window_start}
+        return len(events)
+
+    def _run(self):
+        app = self._app
+        interval = app.config['LEADERBOARD_STREAM_POLL_INTERVAL']
+        while True:
+            time.sleep(interval)
+            if not self._subscribers:
+                continue
+            with app.app_context():
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    print(f"Leaderboard broadcaster error: {e}")
+                finally:
+                    db.session.remove()
+
+
+def leaderboard_stream(app, last_event_id=None):
+    """Generate the SSE body for one client: replay anything it missed since
+    `last_event_id`, then relay live events with periodic keepalives."""
+    subscriber = leaderboard_broadcaster.subscribe(app)
+    keepalive = app.config['LEADERBOARD_STREAM_KEEPALIVE']
+    try:
+        yield 'retry: 3000\n\n'
+        # Late events can arrive with a lower ID, so the SSE id sent is the
+        # highest one so far; replayed IDs are not relayed again
+        sent, replayed = last_event_id or 0, set()
+        if last_event_id is not None:
+            with app.app_context():
+                for event in events_since(last_event_id):
+                    sent = max(sent, event['id'])
+                    replayed.add(event['id'])
+                    yield format_sse(event, sent)
+        while True:
+            try:
+                event = subscriber.get(timeout=keepalive)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if event['id'] not in replayed:
+                sent = max(sent, event['id'])
+                yield format_sse(event, sent)
+    finally:
+        leaderboard_broadcaster.unsubscribe(subscriber)
+
+
+def format_sse(event, last_id=None):
+    """One SSE message; `last_id` (default the event's own) is what the client
+    sends back as Last-Event-ID when it reconnects."""
+    return f"id: {event['id'] if last_id is None else last_id}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def events_since(event_id, limit=500):
+    """Events after `event_id`, used to replay what a reconnecting client
+    missed. Recent events are re-sent too, in case one committed late. When
+    more than `limit` are missing, or some were already pruned, a single
+    rebuild marker is returned instead and the client reloads the board."""
+    events = LeaderboardEvent.since(event_id, overlap=current_app.config['LEADERBOARD_EVENT_OVERLAP'], limit=limit + 1)
+    missing = [event for event in events if event.eventID > event_id]
+    oldest = db.session.scalar(db.select(db.func.min(LeaderboardEvent.eventID)))
+    if len(missing) > limit or (oldest is not None and oldest > event_id + 1):
+        latest = db.session.scalar(db.select(db.func.max(LeaderboardEvent.eventID)))
+        return [{'id': latest, 'type': 'rebuild'}]
+    return [{'id': event.eventID, **event.to_json()} for event in events]
+
+
+leaderboard_broadcaster = LeaderboardBroadcaster()
@@ -0,0 +1,78 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt'
+DEFAULT_SALT_LENGTH = 16
+
+
+def _settings():
+    if has_app_context():
+        config = current_app.config
+        return config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD), config.get('PASSWORD_SALT_LENGTH', DEFAULT_SALT_LENGTH)
+    return DEFAULT_METHOD, DEFAULT_SALT_LENGTH
+
+
+def _gevent_threadpool():
+    """The gevent hub's pool of real OS threads when running under a
+    monkey-patched gevent worker, otherwise None."""
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None and monkey.is_module_patched('threading'):
+        import gevent
+        return gevent.get_hub().threadpool
+    return None
+
+
+def _offload(fn, *args):
+    # hashlib's scrypt/pbkdf2 release the GIL, so running them on an OS thread
+    # lets the gevent loop keep serving other greenlets meanwhile
+    pool = _gevent_threadpool()
+    if pool is not None:
+        return pool.apply(fn, args)
+    return fn(*args)
+
+
+@lru_cache(maxsize=16)
+def _method_prefix(method):
+    """Canonical parameter prefix werkzeug writes for `method`, e.g. 'scrypt:32768:8:1'."""
+    return generate_password_hash('', method, salt_length=1).split('$', 1)[0]
+
+
+def hash_password(password, method=None, salt_length=None):
+    default_method, default_salt = _settings()
+    return _offload(generate_password_hash, password, method or default_method, salt_length or default_salt)
+
+
+def verify_password(pwhash, password):
+    return _offload(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash):
+    """True when a stored hash was made with different method, cost or salt settings."""
+    method, salt_length = _settings()
+    try:
+        prefix, salt, _ = pwhash.split('$', 2)
+    except ValueError:
+        return True
+    return prefix != _method_prefix(method) or len(salt) != salt_length
+
+
+def hash_passwords(passwords, workers=None):
+    """Hash many passwords in parallel across cores and return them in order."""
+    passwords = list(passwords)
+    method, salt_length = _settings()
+
+    def hash_one(password):
+        return generate_password_hash(password, method, salt_length)
+
+    pool = _gevent_threadpool()
+    if pool is not None:
+        return list(pool.imap(hash_one, passwords))
+    if len(passwords) < 2:
+        return [hash_one(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        return list(executor.map(hash_one, passwords))
@@ -0,0 +1,86 @@
+import os
+import threading
+
+from flask import current_app
+
+from App.database import db
+from App.models import Job
+from App.controllers import update_leaderboard, initialize_full, import_records
+
+
+def _import_job(kind, path, fmt=None, batch_size=1000, remove=False):
+    result = import_records(kind, path, fmt=fmt, batch_size=batch_size)
+    if remove:
+        # Uploaded copy; on failure it is kept so a retry resumes from its checkpoint
+        os.remove(path)
+    return result
+
+
+# Job kind -> function called with the job's params; its return value is stored as the result
+JOB_HANDLERS = {
+    'update_leaderboard': update_leaderboard,
+    'initialize_full': initialize_full,
+    'import': _import_job
+}
+
+
+class JobRunner:
+    """Runs queued Jobs one at a time on a background thread of this process.
+
+    Each gunicorn worker starts the thread once it has booted (see
+    post_worker_init in gunicorn_config.py), otherwise it starts with the
+    first submission. It polls the job table, so work queued by other workers
+    (or the CLI) is picked up too. The web request only enqueues and returns.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._app = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def submit(self, app, kind, params=None):
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f'Unknown job kind {kind}')
+        job = Job.enqueue(kind, params)
+        self.start(app)
+        self._wake.set()
+        return job
+
+    def start(self, app):
+        with self._lock:
+            if self._thread is None:
+                self._app = app
+                self._thread = threading.Thread(target=self._run, name='job-runner', daemon=True)
+                self._thread.start()
+
+    def run_next(self):
+        """Claim and run one queued job; returns it, or None when none are queued."""
+        job = Job.claimNext(current_app.config['JOB_TIMEOUT'])
+        if job is None:
+            return None
+        snapshot = job.to_json()
+        try:
+            result = JOB_HANDLERS[job.kind](**job.params)
+        except Exception as e:
+            db.session.rollback()
+            return Job.finish(snapshot, error=f'{type(e).__name__}: {e}')
+        return Job.finish(snapshot, result=result)
+
+    def _run(self):
+        app = self._app
+        interval = app.config['JOB_POLL_INTERVAL']
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            with app.app_context():
+                try:
+                    while self.run_next() is not None:
+                        pass
+                except Exception as e:
+                    print(f"Job runner error: {e}")
+                finally:
+                    db.session.remove()
+
+
+job_runner = JobRunner()
@@ -1,13 +1,13 @@
 import os
+import threading
 from flask import Flask, render_template
-from flask_uploads import DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
-from werkzeug.datastructures import  FileStorage
 
 
-from App.database import init_db
+from App.database import init_db, make_psycopg2_cooperative, setup_unit_of_work
 from App.config import load_config
+from App.sqlstats import setup_sql_stats
+from App.metrics import setup_metrics
 
 
 from App.controllers import (
@@ -21,17 +21,50 @@ def add_views(app):
     for view in views:
         app.register_blueprint(view)
 
+def setup_uploads(app):
+    from flask_uploads import DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
+    photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
+    configure_uploads(app, photos)
+
+def defer_until_first_request(app, *setups):
+    """Run each of `setups` (called with the app) just before the first
+    request is dispatched instead of at startup, so CLI commands and worker
+    boot don't pay for them. Flask still accepts blueprints at that point.
+    Requests arriving meanwhile wait until every setup has finished.
+    Returns a function that runs them early, e.g. to warm a preloaded app."""
+    wsgi_app = app.wsgi_app
+    lock = threading.Lock()
+    pending = list(setups)
+
+    def run_setups():
+        with lock:
+            while pending:
+                pending[0](app)
+                # Only dropped once done, so no request passes while one still runs
+                pending.pop(0)
+
+    def first_request(environ, start_response):
+        if pending:
+            run_setups()
+        return wsgi_app(environ, start_response)
+
+    app.wsgi_app = first_request
+    return run_setups
+
 def create_app(overrides={}):
+    make_psycopg2_cooperative()
     app = Flask(__name__, static_url_path='/static')
     load_config(app, overrides)
     CORS(app)
     add_auth_context(app)
-    photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
-    configure_uploads(app, photos)
     add_views(app)
     init_db(app)
+    setup_sql_stats(app)
+    setup_metrics(app)
     jwt = setup_jwt(app)
-    setup_admin(app)
+    # The admin UI and upload sets only matter once requests are served; the
+    # views they add are wrapped in units of work after them
+    app.extensions['deferred_setup'] = defer_until_first_request(app, setup_uploads, setup_admin, setup_unit_of_work)
     @jwt.invalid_token_loader
     @jwt.unauthorized_loader
     def custom_unauthorized_response(error):
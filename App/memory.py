@@ -0,0 +1,53 @@
+import os
+
+# smaps_rollup fields (in kB) that make up a process's resident set
+_ROLLUP_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def process_memory(pid):
+    """Resident memory of `pid` in MB, split into pages only it maps
+    (`unique`), pages shared with other processes such as its forked
+    siblings (`shared`), and its proportional share of everything (`pss`).
+    Read from /proc, so Linux only."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in _ROLLUP_FIELDS:
+                fields[name] = int(value.split()[0])
+    return {
+        'pid': pid,
+        'rss': round(fields['Rss'] / 1024, 1),
+        'unique': round((fields['Private_Clean'] + fields['Private_Dirty']) / 1024, 1),
+        'shared': round((fields['Shared_Clean'] + fields['Shared_Dirty']) / 1024, 1),
+        'pss': round(fields['Pss'] / 1024, 1)
+    }
+
+
+def child_pids(pid):
+    """Direct children of `pid` (e.g. a gunicorn master's workers)."""
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            children.extend(int(child) for child in f.read().split())
+    return sorted(children)
+
+
+def worker_memory(master_pid):
+    """Memory of a pre-forking server: its master and each worker, plus the
+    mean unique memory per worker, which is what each added worker costs."""
+    master = process_memory(master_pid)
+    workers = [process_memory(pid) for pid in child_pids(master_pid)]
+    unique = [worker['unique'] for worker in workers]
+    return {
+        'master': master,
+        'workers': workers,
+        'worker_unique_mean': round(sum(unique) / len(unique), 1) if unique else None,
+        'total_pss': round(master['pss'] + sum(worker['pss'] for worker in workers), 1)
+    }
+
+
+def workers_that_fit(memory_budget_mb, master_mb, worker_unique_mb):
+    """How many workers of `worker_unique_mb` private memory fit in the budget
+    next to a master whose (shared) footprint is `master_mb`."""
+    return max(1, int((memory_budget_mb - master_mb) // worker_unique_mb))
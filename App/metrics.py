@@ -0,0 +1,101 @@
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+                               CONTENT_TYPE_LATEST, generate_latest, multiprocess)
+from sqlalchemy import event
+
+from App.database import db
+
+# Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+# (set up in gunicorn_config.py) and a scrape of any worker merges them all.
+# Without it the metrics are simply those of the current process.
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by blueprint and endpoint',
+    ['blueprint', 'endpoint', 'method']
+)
+REQUESTS = Counter(
+    'http_requests_total', 'Requests served by blueprint, endpoint and status',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+REQUEST_ERRORS = Counter(
+    'http_request_errors_total', 'Requests that ended in a 5xx response or an unhandled exception',
+    ['blueprint', 'endpoint', 'method']
+)
+IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'Requests currently being handled by each worker',
+    multiprocess_mode='liveall'
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for a database connection from the pool',
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+)
+
+
+def _labels():
+    return {
+        'blueprint': request.blueprint or '',
+        # Unmatched URLs share one label so 404 scans cannot blow up cardinality
+        'endpoint': request.endpoint or '',
+        'method': request.method
+    }
+
+
+def _time_pool_checkouts(engine):
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+
+def metrics_response():
+    """(body, content type) of the current metrics in Prometheus text format."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def setup_metrics(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    with app.app_context():
+        engine = db.engine
+        _time_pool_checkouts(engine)
+        # dispose() swaps in a fresh pool, which needs wrapping again
+        event.listen(engine, 'engine_disposed', _time_pool_checkouts)
+
+    @app.before_request
+    def start_request_metrics():
+        IN_PROGRESS.inc()
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            labels = _labels()
+            REQUEST_LATENCY.labels(**labels).observe(time.perf_counter() - started)
+            REQUESTS.labels(status=str(response.status_code), **labels).inc()
+            if response.status_code >= 500:
+                REQUEST_ERRORS.labels(**labels).inc()
+            IN_PROGRESS.dec()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc=None):
+        # Only still set when after_request never ran, i.e. the exception propagated
+        if g.pop('_metrics_started', None) is not None:
+            REQUEST_ERRORS.labels(**_labels()).inc()
+            IN_PROGRESS.dec()
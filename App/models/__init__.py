@@ -2,6 +2,12 @@ from .user import User
 from .activitylog import ActivityLog
 from .accolade import Accolade
 from .leaderboardentry import LeaderBoardEntry
+from .milestone import Milestone
+from .dataversion import DataVersion
+from .leaderboardevent import LeaderboardEvent
+from .job import Job
+from .dailyrollup import DailyRollup
+from .importcheckpoint import ImportCheckpoint
 from .student import Student
 from .staff import Staff
 
@@ -11,6 +17,12 @@ import App.models.staff
 import App.models.activitylog
 import App.models.accolade
 import App.models.leaderboardentry
+import App.models.milestone
+import App.models.dataversion
+import App.models.leaderboardevent
+import App.models.job
+import App.models.dailyrollup
+import App.models.importcheckpoint
 
 # Make types available at module level
 ActivityLog.Student = Student
@@ -18,9 +30,11 @@ Staff.Student = Student
 Staff.ActivityLog = ActivityLog
 Staff.Accolade = Accolade
 Staff.LeaderBoardEntry = LeaderBoardEntry
+Staff.Milestone = Milestone
+Staff.DailyRollup = DailyRollup
 Student.ActivityLog = ActivityLog
 Student.LeaderBoardEntry = LeaderBoardEntry
 Student.Accolade = Accolade
 LeaderBoardEntry.Student = Student
 
-__all__ = ['User', 'Student', 'Staff', 'Accolade', 'ActivityLog', 'LeaderBoardEntry']
\ No newline at end of file
+__all__ = ['User', 'Student', 'Staff', 'Accolade', 'ActivityLog', 'LeaderBoardEntry', 'Milestone', 'DataVersion', 'LeaderboardEvent', 'Job', 'DailyRollup', 'ImportCheckpoint']
\ No newline at end of file
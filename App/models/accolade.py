@@ -1,9 +1,12 @@
-from App.database import db
+from App.database import db, insert_ignore, commit
 from datetime import datetime
-import uuid
 
 class Accolade(db.Model):
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # A student earns each milestone at most once
+        db.Index('uq_accolade_student_milestone', 'studentID', 'milestoneHours', unique=True),
+        {'extend_existing': True}
+    )
     accoladeID = db.Column(db.String, primary_key=True)
     studentID = db.Column(db.String, db.ForeignKey('student.studentID'), nullable=True)
     name = db.Column(db.String, nullable=False)
@@ -17,22 +20,44 @@ class Accolade(db.Model):
         self.milestoneHours = milestoneHours
         self.dateAwarded = dateAwarded
 
+    @staticmethod
+    def makeID(studentID: str, hours: int) -> str:
+        """The accolade ID for a milestone earned by a student; the unique
+        index allows one per pair. A template (no student) gets ':<hours>'."""
+        return f'{studentID or ""}:{hours}'
+
     @staticmethod
     def createAccolade(name: str, milestone: int) -> 'Accolade':
-        new_accolade = Accolade(
-            accoladeID=str(uuid.uuid4()),
+        """Define a milestone accolade: the Milestone that awards it automatically
+        and an unawarded template (no student) that awardAccolade() can hand out."""
+        from App.models.milestone import Milestone
+        template = db.session.merge(Accolade(
+            accoladeID=Accolade.makeID(None, milestone),
             studentID=None,
             name=name,
             milestoneHours=milestone,
             dateAwarded=datetime.utcnow()
-        )
-        db.session.add(new_accolade)
-        db.session.commit()
-        return new_accolade
+        ))
+        Milestone.createMilestone(milestone, name)  # commits the template too
+        return template
+
+    @staticmethod
+    def awardMilestones(studentID: str, milestones: list) -> None:
+        """Award (hours, name) milestones to a student, skipping any already held."""
+        if not milestones:
+            return
+        now = datetime.utcnow()
+        db.session.execute(insert_ignore(Accolade.__table__), [
+            {'accoladeID': Accolade.makeID(studentID, hours), 'studentID': studentID, 'name': name,
+             'milestoneHours': hours, 'dateAwarded': now}
+            for hours, name in milestones
+        ])
 
     @staticmethod
     def awardAccolade(studentID: str, accoladeID: str) -> None:
-        accolade = Accolade.query.filter_by(accoladeID=accoladeID).first()
-        if accolade:
-            accolade.studentID = studentID
-            db.session.commit()
\ No newline at end of file
+        """Give a student the accolade defined by the template `accoladeID`
+        (see createAccolade), unless they already hold it."""
+        template = db.session.get(Accolade, accoladeID)
+        if template:
+            Accolade.awardMilestones(studentID, [(template.milestoneHours, template.name)])
+            commit()
@@ -1,9 +1,17 @@
-from App.database import db
+from App.database import db, commit
 from datetime import datetime
 import uuid
 
 class ActivityLog(db.Model):
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Per-student status filters, newest-first lookups and covering confirmed-hour sums
+        db.Index('ix_activity_log_student_status', 'studentID', 'status', 'dateLogged', 'hoursLogged'),
+        # Review queue: pending logs newest first
+        db.Index('ix_activity_log_status_date', 'status', 'dateLogged'),
+        # Covering scan of every confirmed log grouped by student (the hours statistics)
+        db.Index('ix_activity_log_status_student', 'status', 'studentID', 'dateLogged', 'hoursLogged'),
+        {'extend_existing': True}
+    )
     logID = db.Column(db.String, primary_key=True)
     studentID = db.Column(db.String, db.ForeignKey('student.studentID'), nullable=False)
     hoursLogged = db.Column(db.Integer, nullable=False)
@@ -45,7 +53,7 @@ class ActivityLog(db.Model):
             description=description
         )
         db.session.add(new_log)
-        db.session.commit()
+        commit()
         return new_log
 
     def to_json(self) -> dict:
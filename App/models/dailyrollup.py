@@ -0,0 +1,44 @@
+from App.database import db, dialect_insert
+
+class DailyRollup(db.Model):
+    """Confirmed hours per student per day (the day the activity was logged),
+    so windowed leaderboards sum a few rows per student instead of every log."""
+    __table_args__ = (
+        # Window scans: every student's rows for a day range, covering the hours
+        db.Index('ix_daily_rollup_day', 'day', 'studentID', 'hours'),
+        {'extend_existing': True}
+    )
+    studentID = db.Column(db.String, db.ForeignKey('student.studentID'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    hours = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def addHours(totals: dict) -> None:
+        """Add {(studentID, day): hours} to the rollups in one upsert."""
+        if not totals:
+            return
+        table = DailyRollup.__table__
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.studentID, table.c.day],
+            set_={'hours': table.c.hours + stmt.excluded.hours}
+        )
+        db.session.execute(stmt, [
+            {'studentID': studentID, 'day': day, 'hours': hours}
+            for (studentID, day), hours in totals.items()
+        ])
+
+    @staticmethod
+    def rebuild() -> int:
+        """Recompute every rollup from the confirmed activity logs; returns the row count."""
+        from App.models.activitylog import ActivityLog
+        day = db.func.date(ActivityLog.dateLogged)
+        confirmed = (
+            db.select(ActivityLog.studentID, day, db.func.sum(ActivityLog.hoursLogged))
+            .where(ActivityLog.status == 'confirmed')
+            .group_by(ActivityLog.studentID, day)
+        )
+        db.session.execute(db.delete(DailyRollup))
+        return db.session.execute(
+            db.insert(DailyRollup).from_select(['studentID', 'day', 'hours'], confirmed)
+        ).rowcount
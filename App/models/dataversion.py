@@ -0,0 +1,30 @@
+from App.database import db, insert_ignore
+
+class DataVersion(db.Model):
+    """Single-row counter bumped by every write that changes leaderboard or
+    accolade data, so readers can cheaply tell whether anything changed."""
+    __table_args__ = {'extend_existing': True}
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    ROW_ID = 1
+
+    @staticmethod
+    def current() -> int:
+        version = db.session.scalar(db.select(DataVersion.version).filter_by(id=DataVersion.ROW_ID))
+        return version or 0
+
+    @staticmethod
+    def bump() -> None:
+        """Increment the version inside the caller's transaction."""
+        increment = (
+            db.update(DataVersion)
+            .filter_by(id=DataVersion.ROW_ID)
+            .values(version=DataVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.execute(increment).rowcount == 0:
+            inserted = db.session.execute(insert_ignore(DataVersion.__table__).values(id=DataVersion.ROW_ID, version=1))
+            if inserted.rowcount == 0:
+                # Another transaction created the row first
+                db.session.execute(increment)
@@ -0,0 +1,32 @@
+from App.database import db, dialect_insert
+from datetime import datetime
+
+class ImportCheckpoint(db.Model):
+    """How many rows of an import file are committed. It is saved in the same
+    transaction as each chunk, so a rerun resumes exactly after the last
+    commit and never inserts a chunk twice."""
+    __table_args__ = {'extend_existing': True}
+    path = db.Column(db.String, primary_key=True)
+    kind = db.Column(db.String, nullable=False)
+    rows = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @staticmethod
+    def read(path: str, kind: str) -> int:
+        """Rows already imported from `path` as `kind` (0 if none)."""
+        checkpoint = db.session.get(ImportCheckpoint, path)
+        return checkpoint.rows if checkpoint and checkpoint.kind == kind else 0
+
+    @staticmethod
+    def save(path: str, kind: str, rows: int) -> None:
+        """Record `rows` inside the caller's transaction."""
+        stmt = dialect_insert(ImportCheckpoint.__table__).values(
+            path=path, kind=kind, rows=rows, updated=datetime.utcnow())
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['path'],
+            set_={'kind': stmt.excluded.kind, 'rows': stmt.excluded.rows, 'updated': stmt.excluded.updated}
+        ))
+
+    @staticmethod
+    def clear(path: str) -> None:
+        db.session.execute(db.delete(ImportCheckpoint).filter_by(path=path))
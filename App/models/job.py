@@ -0,0 +1,124 @@
+from App.database import db, insert_ignore, independent_session
+from datetime import datetime, timedelta
+from sqlalchemy.orm import aliased
+import json
+import uuid
+
+class Job(db.Model):
+    """A unit of background work (e.g. a leaderboard rebuild) run by App.jobs.
+    Status goes queued -> running -> done | failed. Status changes commit in
+    an independent_session(), never as part of the caller's transaction."""
+    __table_args__ = (
+        # Claiming the oldest queued job
+        db.Index('ix_job_status_created', 'status', 'created'),
+        # At most one queued job per coalescing key, so concurrent enqueues share it
+        db.Index('ix_job_queued_key', 'coalesceKey', unique=True,
+                 sqlite_where=db.text("status = 'queued'"), postgresql_where=db.text("status = 'queued'")),
+        {'extend_existing': True}
+    )
+    jobID = db.Column(db.String, primary_key=True)
+    kind = db.Column(db.String, nullable=False)
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    coalesceKey = db.Column(db.String, nullable=True)
+    status = db.Column(db.String, nullable=False, default='queued')
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.String, nullable=True)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started = db.Column(db.DateTime, nullable=True)
+    finished = db.Column(db.DateTime, nullable=True)
+
+    @staticmethod
+    def enqueue(kind: str, params: dict = None, coalesce: bool = True) -> 'Job':
+        """Queue a job and commit. With `coalesce`, an identical job that is
+        still waiting to run is returned instead of queueing another; the
+        unique index on queued coalescing keys settles concurrent enqueues."""
+        params = params or {}
+        key = f'{kind}:{json.dumps(params, sort_keys=True)}' if coalesce else None
+        while True:
+            jobID = str(uuid.uuid4())
+            with independent_session() as session:
+                inserted = session.execute(insert_ignore(Job.__table__).values(
+                    jobID=jobID, kind=kind, params=params, coalesceKey=key, status='queued', created=datetime.utcnow()
+                )).rowcount
+                session.commit()
+                if inserted:
+                    return session.get(Job, jobID)
+                job = session.scalars(db.select(Job).filter_by(coalesceKey=key, status='queued')).first()
+                # Otherwise the queued twin was claimed in between; queue this one after all
+                if job:
+                    return job
+
+    @staticmethod
+    def requeueStale(timeout: float) -> int:
+        """Put jobs that have been running for more than `timeout` seconds (e.g.
+        because their worker died) back in the queue. Returns how many."""
+        cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+        stale = (Job.status == 'running', Job.started < cutoff)
+        # One identical to a job queued since then is dropped instead, keeping queued keys unique
+        twin = aliased(Job)
+        queued_twin = db.select(twin.jobID).where(twin.coalesceKey == Job.coalesceKey, twin.status == 'queued').exists()
+        with independent_session() as session:
+            session.execute(
+                db.update(Job).filter(*stale, queued_twin)
+                .values(status='failed', error='Abandoned by its worker; an identical job is queued',
+                        finished=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            return session.execute(
+                db.update(Job).filter(*stale)
+                .values(status='queued', started=None)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+    @staticmethod
+    def claimNext(timeout: float = None) -> 'Job':
+        """Mark the oldest queued job running and return it, or None. The
+        conditional UPDATE makes sure only one runner gets each job. With a
+        `timeout`, jobs left running longer than that are requeued first."""
+        if timeout is not None:
+            Job.requeueStale(timeout)
+        while True:
+            with independent_session() as session:
+                jobID = session.scalar(
+                    db.select(Job.jobID).filter_by(status='queued').order_by(Job.created).limit(1)
+                )
+                if jobID is None:
+                    return None
+                claimed = session.execute(
+                    db.update(Job).filter_by(jobID=jobID, status='queued')
+                    .values(status='running', started=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                session.commit()
+                if claimed:
+                    return session.get(Job, jobID)
+
+    @staticmethod
+    def finish(snapshot: dict, result=None, error: str = None) -> 'Job':
+        """Record the outcome of the job described by `snapshot` (its to_json()).
+        The row is recreated if the job itself reset the schema."""
+        with independent_session() as session:
+            job = session.get(Job, snapshot['id'])
+            if job is None:
+                job = Job(jobID=snapshot['id'], kind=snapshot['kind'], params=snapshot['params'],
+                          created=datetime.fromisoformat(snapshot['created']))
+                session.add(job)
+            job.status = 'failed' if error else 'done'
+            job.result = result
+            job.error = error
+            job.started = datetime.fromisoformat(snapshot['started']) if snapshot['started'] else None
+            job.finished = datetime.utcnow()
+        return job
+
+    def to_json(self) -> dict:
+        return {
+            'id': self.jobID,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created': self.created.isoformat(),
+            'started': self.started.isoformat() if self.started else None,
+            'finished': self.finished.isoformat() if self.finished else None
+        }
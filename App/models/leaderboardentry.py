@@ -1,12 +1,20 @@
-from App.database import db
-import uuid 
+from App.database import db, commit
+import uuid
 from typing import TYPE_CHECKING
+from sqlalchemy import and_, or_, func
+from App.models.leaderboardevent import LeaderboardEvent
 
 if TYPE_CHECKING:
     from App.models.student import Student
 
 class LeaderBoardEntry(db.Model):
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index('ix_leader_board_entry_student', 'studentID', unique=True),
+        # Ranking key used to find a student's new position
+        db.Index('ix_leader_board_entry_hours', 'totalHours', 'studentID'),
+        db.Index('ix_leader_board_entry_rank', 'rank'),
+        {'extend_existing': True}
+    )
     entryID = db.Column(db.String, primary_key=True)
     studentID = db.Column(db.String, db.ForeignKey('student.studentID'))
     rank = db.Column(db.Integer)
@@ -20,26 +28,133 @@ class LeaderBoardEntry(db.Model):
         self.totalHours = totalHours
         self.totalAccolades = totalAccolades
 
+    @staticmethod
+    def _behind(totalHours: int, studentID: str):
+        """SQL condition for entries ranked after the key (totalHours, studentID).
+        Entries are ordered by totalHours descending, ties broken by studentID."""
+        return or_(
+            LeaderBoardEntry.totalHours < totalHours,
+            and_(LeaderBoardEntry.totalHours == totalHours, LeaderBoardEntry.studentID > studentID)
+        )
+
+    @staticmethod
+    def _shift(low: int, high, step: int, studentID: str) -> None:
+        """Move every other entry ranked within [low, high] by `step` places.
+        A `high` of None leaves the range open-ended."""
+        stmt = (
+            db.update(LeaderBoardEntry)
+            .where(LeaderBoardEntry.rank >= low, LeaderBoardEntry.studentID != studentID)
+            .values(rank=LeaderBoardEntry.rank + step)
+        )
+        if high is not None:
+            stmt = stmt.where(LeaderBoardEntry.rank <= high)
+        db.session.execute(stmt)
+
+    def _reposition(self, oldHours) -> None:
+        """Reassign ranks after this entry's totalHours changed from `oldHours`.
+        Only the entries between the old and new position are touched."""
+        newHours = self.totalHours
+        others = db.select(LeaderBoardEntry.rank).where(LeaderBoardEntry.studentID != self.studentID)
+        if oldHours is None:
+            # New entry: it takes the rank of the first entry behind it
+            first_behind = db.session.scalar(
+                others.where(LeaderBoardEntry._behind(newHours, self.studentID))
+                .order_by(LeaderBoardEntry.rank).limit(1)
+            )
+            if first_behind is None:
+                self.rank = (db.session.scalar(others.with_only_columns(func.max(LeaderBoardEntry.rank))) or 0) + 1
+            else:
+                LeaderBoardEntry._shift(first_behind, None, 1, self.studentID)
+                self.rank = first_behind
+        elif newHours > oldHours:
+            first_behind = db.session.scalar(
+                others.where(LeaderBoardEntry._behind(newHours, self.studentID))
+                .order_by(LeaderBoardEntry.rank).limit(1)
+            )
+            if first_behind is not None and first_behind < self.rank:
+                LeaderBoardEntry._shift(first_behind, self.rank - 1, 1, self.studentID)
+                self.rank = first_behind
+        elif newHours < oldHours:
+            last_ahead = db.session.scalar(
+                others.where(~LeaderBoardEntry._behind(newHours, self.studentID))
+                .order_by(LeaderBoardEntry.rank.desc()).limit(1)
+            )
+            if last_ahead is not None and last_ahead > self.rank:
+                LeaderBoardEntry._shift(self.rank + 1, last_ahead, -1, self.studentID)
+                self.rank = last_ahead
+
     @staticmethod
     def updateEntry(student: 'Student') -> 'LeaderBoardEntry':
         """Create or update a leaderboard entry for the given student and return it.
         Tests expect this to be callable as LeaderBoardEntry.updateEntry(student) and return an entry with totalHours set.
+        Ranks are adjusted incrementally, then committed (inside a unit_of_work() only flushed).
         """
         entry = LeaderBoardEntry.query.filter_by(studentID=student.studentID).first()
+        totalHours = student.totalHours if hasattr(student, 'totalHours') else 0
+        totalAccolades = len(student.viewAccolades()) if hasattr(student, 'viewAccolades') else 0
         if not entry:
             entry = LeaderBoardEntry(
                 entryID=str(uuid.uuid4()),
                 studentID=student.studentID,
                 rank=0,
-                totalHours=student.totalHours if hasattr(student, 'totalHours') else 0,
-                totalAccolades=len(student.viewAccolades()) if hasattr(student, 'viewAccolades') else 0
+                totalHours=totalHours,
+                totalAccolades=totalAccolades
             )
+            entry._reposition(None)
             db.session.add(entry)
         else:
-            entry.totalHours = student.totalHours if hasattr(student, 'totalHours') else 0
-            entry.totalAccolades = len(student.viewAccolades()) if hasattr(student, 'viewAccolades') else 0
-        db.session.commit()
+            oldHours = entry.totalHours or 0
+            entry.totalHours = totalHours
+            entry.totalAccolades = totalAccolades
+            entry._reposition(oldHours)
+        db.session.flush()
+        LeaderboardEvent.record(entry.studentID, entry.totalHours, entry.rank)
+        commit()
         return entry
 
+    @staticmethod
+    def addStudents(studentIDs: list) -> None:
+        """Give newly created students a zero-hour entry in their place on the
+        board, so incremental ranks agree with a full rebuild. The caller commits."""
+        if not studentIDs:
+            return
+        db.session.execute(db.insert(LeaderBoardEntry.__table__), [
+            {'entryID': str(uuid.uuid4()), 'studentID': student_id, 'rank': 0,
+             'totalHours': 0, 'totalAccolades': 0} for student_id in studentIDs
+        ])
+        # New entries sort among the zero-hour tail; nothing above it moves
+        LeaderBoardEntry.rerank(high=0)
+        LeaderboardEvent.recordEntries(list(studentIDs))
+
+    @staticmethod
+    def rerank(low: int = None, high: int = None) -> None:
+        """Reassign ranks in a single statement: every entry for a full rebuild,
+        or with `low`/`high` (as batch confirmations and new students use it)
+        only entries whose totalHours lie in that range, numbered on from the
+        entries above it. That is enough when every changed entry has both its
+        old and new totalHours inside the range."""
+        in_range = []
+        if low is not None:
+            in_range.append(LeaderBoardEntry.totalHours >= low)
+        offset = 0
+        if high is not None:
+            in_range.append(LeaderBoardEntry.totalHours <= high)
+            offset = db.session.scalar(
+                db.select(func.count()).select_from(LeaderBoardEntry).where(LeaderBoardEntry.totalHours > high)
+            )
+        ranked = db.select(
+            LeaderBoardEntry.entryID,
+            (func.row_number().over(
+                order_by=(LeaderBoardEntry.totalHours.desc(), LeaderBoardEntry.studentID)
+            ) + offset).label('position')
+        ).where(*in_range).subquery()
+        db.session.execute(
+            db.update(LeaderBoardEntry)
+            .where(LeaderBoardEntry.entryID == ranked.c.entryID)
+            .values(rank=ranked.c.position),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.expire_all()
+
     def getRank(self) -> int:
-        return self.rank
\ No newline at end of file
+        return self.rank
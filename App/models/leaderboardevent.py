@@ -0,0 +1,88 @@
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from App.database import db
+
+class LeaderboardEvent(db.Model):
+    """Append-only feed of leaderboard changes tailed by the SSE stream.
+    A row with studentID NULL means the whole board was rebuilt."""
+    # Readers tail the feed by eventID, so IDs must never be reused once old
+    # events are pruned (SQLite would otherwise restart them after an emptied table)
+    __table_args__ = {'extend_existing': True, 'sqlite_autoincrement': True}
+    eventID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    studentID = db.Column(db.String, nullable=True)
+    totalHours = db.Column(db.Integer, nullable=True)
+    rank = db.Column(db.Integer, nullable=True)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    # When this process last pruned the feed (time.monotonic())
+    _last_prune = None
+
+    @staticmethod
+    def record(studentID: str, totalHours: int, rank: int) -> None:
+        db.session.execute(db.insert(LeaderboardEvent).values(
+            studentID=studentID, totalHours=totalHours, rank=rank, created=datetime.utcnow()))
+        LeaderboardEvent.pruneIfDue()
+
+    @staticmethod
+    def recordEntries(studentIDs: list) -> None:
+        """Record the current leaderboard entries of several students in one INSERT ... SELECT."""
+        from App.models.leaderboardentry import LeaderBoardEntry
+        current = db.select(
+            LeaderBoardEntry.studentID, LeaderBoardEntry.totalHours, LeaderBoardEntry.rank,
+            db.literal(datetime.utcnow(), db.DateTime)
+        ).where(LeaderBoardEntry.studentID.in_(studentIDs))
+        db.session.execute(db.insert(LeaderboardEvent).from_select(
+            ['studentID', 'totalHours', 'rank', 'created'], current))
+        LeaderboardEvent.pruneIfDue()
+
+    @staticmethod
+    def since(eventID: int, seen=(), overlap: float = 0, limit: int = None) -> list:
+        """Events after `eventID` in ID order (at most `limit` of them), preceded
+        by any lower-numbered events recorded in the last `overlap` seconds
+        whose IDs are not in `seen`. Sequence values can commit out of order
+        (e.g. on Postgres), so an event may only become visible after higher
+        IDs were read; re-reading the recent window catches it."""
+        newer = db.select(LeaderboardEvent).where(LeaderboardEvent.eventID > eventID).order_by(LeaderboardEvent.eventID)
+        if limit is not None:
+            newer = newer.limit(limit)
+        events = db.session.scalars(newer).all()
+        if overlap:
+            recent = db.session.scalars(db.select(LeaderboardEvent.eventID).where(
+                LeaderboardEvent.eventID <= eventID,
+                LeaderboardEvent.created >= datetime.utcnow() - timedelta(seconds=overlap)
+            )).all()
+            late = [event_id for event_id in recent if event_id not in seen]
+            if late:
+                events = db.session.scalars(
+                    db.select(LeaderboardEvent).where(LeaderboardEvent.eventID.in_(late)).order_by(LeaderboardEvent.eventID)
+                ).all() + events
+        return events
+
+    @staticmethod
+    def prune(retention: int) -> int:
+        """Delete events older than `retention` seconds in the caller's transaction."""
+        cutoff = datetime.utcnow() - timedelta(seconds=retention)
+        return db.session.execute(db.delete(LeaderboardEvent).where(LeaderboardEvent.created < cutoff)).rowcount
+
+    @staticmethod
+    def pruneIfDue() -> None:
+        """Prune from the write path, at most once per retention period per
+        process, so the feed stays bounded whether or not anyone streams it."""
+        retention = current_app.config['LEADERBOARD_EVENT_RETENTION']
+        now = time.monotonic()
+        if LeaderboardEvent._last_prune is not None and now - LeaderboardEvent._last_prune < retention:
+            return
+        LeaderboardEvent._last_prune = now
+        LeaderboardEvent.prune(retention)
+
+    @staticmethod
+    def recordRebuild() -> None:
+        LeaderboardEvent.record(None, None, None)
+
+    def to_json(self) -> dict:
+        if self.studentID is None:
+            return {'type': 'rebuild'}
+        return {'type': 'rank', 'studentID': self.studentID, 'total_hours': self.totalHours, 'rank': self.rank}
@@ -0,0 +1,82 @@
+import time
+from bisect import bisect_right
+
+from flask import current_app
+
+from App.database import db, commit, on_commit
+from App.models.dataversion import DataVersion
+
+class Milestone(db.Model):
+    """A confirmed-hours threshold at which students earn an accolade."""
+    __table_args__ = {'extend_existing': True}
+    hours = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, nullable=False)
+
+    DEFAULT_HOURS = (10, 25, 50, 100)
+    # Per-process sorted cache: parallel tuples of thresholds and names. Other
+    # processes may add milestones, so it is reloaded after MILESTONE_CACHE_TTL
+    _hours = None
+    _names = None
+    _loaded = None
+
+    def __init__(self, hours, name=None):
+        self.hours = hours
+        self.name = name or f"{hours} Hour Milestone"
+
+    @staticmethod
+    def load() -> None:
+        """Load (seeding the defaults if the table is empty) the milestone
+        definitions into the sorted in-memory cache."""
+        rows = db.session.execute(db.select(Milestone.hours, Milestone.name).order_by(Milestone.hours)).all()
+        if not rows:
+            defaults = [Milestone(hours) for hours in Milestone.DEFAULT_HOURS]
+            db.session.add_all(defaults)
+            db.session.flush()
+            rows = [(m.hours, m.name) for m in defaults]
+        Milestone._hours = tuple(hours for hours, _ in rows)
+        Milestone._names = tuple(name for _, name in rows)
+        Milestone._loaded = time.monotonic()
+
+    @staticmethod
+    def _cached() -> None:
+        """Load the cache if it is empty or older than MILESTONE_CACHE_TTL."""
+        if Milestone._hours is None or time.monotonic() - Milestone._loaded > current_app.config['MILESTONE_CACHE_TTL']:
+            Milestone.load()
+
+    @staticmethod
+    def reset() -> None:
+        """Drop the cached definitions; the next lookup reloads them."""
+        Milestone._hours = None
+        Milestone._names = None
+
+    @staticmethod
+    def thresholds() -> list:
+        """All milestones as (hours, name) pairs in ascending order."""
+        Milestone._cached()
+        return list(zip(Milestone._hours, Milestone._names))
+
+    @staticmethod
+    def crossed(oldHours: int, newHours: int) -> list:
+        """Milestones passed when a total moves from oldHours to newHours,
+        found by bisection on the cached thresholds without querying."""
+        Milestone._cached()
+        low = bisect_right(Milestone._hours, oldHours)
+        high = bisect_right(Milestone._hours, newHours)
+        return list(zip(Milestone._hours[low:high], Milestone._names[low:high]))
+
+    @staticmethod
+    def createMilestone(hours: int, name: str = None) -> 'Milestone':
+        Milestone.thresholds()  # seed the defaults before adding to them
+        milestone = db.session.get(Milestone, hours)
+        if milestone:
+            milestone.name = name or milestone.name
+        else:
+            milestone = Milestone(hours, name)
+            db.session.add(milestone)
+        # Milestones bucket the cached hours statistics
+        DataVersion.bump()
+        # Only once committed, or a reload inside a unit of work could cache the new
+        # milestone before it exists for anyone else (or survives a rollback)
+        on_commit(Milestone.reset)
+        commit()
+        return milestone
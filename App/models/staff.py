@@ -1,9 +1,9 @@
-from App.database import db
+from App.database import db, commit
 from App.database import db
 from App.models.user import User
 from datetime import datetime
 import uuid
-from App.models import Student, ActivityLog, Accolade, LeaderBoardEntry
+from App.models import Student, ActivityLog, Accolade, LeaderBoardEntry, Milestone, DailyRollup
 
 class Staff(User):
     __tablename__ = 'staff'
@@ -14,8 +14,8 @@ class Staff(User):
         'polymorphic_identity': 'staff'
     }
 
-    def __init__(self, username, password):
-        super().__init__(username, password)
+    def __init__(self, username, password, password_hash=None):
+        super().__init__(username, password, password_hash)
         self.staffID = self.userID
 
     @staticmethod
@@ -31,39 +31,22 @@ class Staff(User):
             # Update student's total hours when confirmed
             student = Student.query.filter_by(studentID=activity_log.studentID).first()
             if student:
+                oldHours = student.totalHours
                 student.totalHours += activity_log.hoursLogged
-                # Check for accolades based on milestones
-                milestones = [10, 25, 50, 100]
-                for milestone in milestones:
-                    if student.totalHours >= milestone:
-                        # Check if accolade already exists for this student and milestone
-                        existing_accolade = Accolade.query.filter_by(
-                            studentID=student.studentID, 
-                            milestoneHours=milestone
-                        ).first()
-                        if not existing_accolade:
-                            # Create and award the accolade
-                            accolade = Accolade(
-                                accoladeID=str(uuid.uuid4()),
-                                studentID=student.studentID,
-                                name=f"{milestone} Hour Milestone",
-                                milestoneHours=milestone,
-                                dateAwarded=datetime.utcnow()
-                            )
-                            db.session.add(accolade)
-                # After awarding accolades and updating hours, ensure leaderboard entry is updated/created
-                try:
-                    LeaderBoardEntry.updateEntry(student)
-                except Exception:
-                    # Ignore errors here; leaderboard is non-critical for the flow
-                    pass
-            db.session.commit()
+                # Award the milestones crossed by this confirmation; the cached
+                # thresholds answer this without querying
+                Accolade.awardMilestones(student.studentID, Milestone.crossed(oldHours, student.totalHours))
+                DailyRollup.addHours({(student.studentID, activity_log.dateLogged.date()): activity_log.hoursLogged})
+                # After awarding accolades and updating hours, move the student's leaderboard
+                # entry; its commit covers all of the above, so ranks never drift from confirmed hours
+                LeaderBoardEntry.updateEntry(student)
+            commit()
 
     def rejectHours(self, activityLogID: str) -> None:
         activity_log = ActivityLog.query.filter_by(logID=activityLogID).first()
         if activity_log and activity_log.status == "pending":
             activity_log.status = "rejected"
-            db.session.commit()
+            commit()
 
     def viewLeaderboard(self) -> list:
         return LeaderBoardEntry.query.all()
\ No newline at end of file
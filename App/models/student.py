@@ -1,4 +1,4 @@
-from App.database import db
+from App.database import db, commit
 from App.models.user import User
 
 """
@@ -17,8 +17,8 @@ class Student(User):
         'polymorphic_identity': 'student'
     }
 
-    def __init__(self, username, password):
-        super().__init__(username, password)
+    def __init__(self, username, password, password_hash=None):
+        super().__init__(username, password, password_hash)
         self.studentID = self.userID
 
     def requestConfirmationOfHours(self, activityLogID: str) -> None:
@@ -26,7 +26,7 @@ class Student(User):
         activity_log = ActivityLog.query.filter_by(logID=activityLogID, studentID=self.studentID).first()
         if activity_log and activity_log.status == "logged":
             activity_log.status = "pending"
-            db.session.commit()
+            commit()
 
     def viewLeaderboard(self) -> list:
         from App.models.leaderboardentry import LeaderBoardEntry
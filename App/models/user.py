@@ -1,5 +1,5 @@
-from werkzeug.security import check_password_hash, generate_password_hash
 from App.database import db
+from App.hashing import hash_password, verify_password
 import uuid
 
 class User(db.Model):
@@ -14,10 +14,15 @@ class User(db.Model):
         'polymorphic_on': user_type
     }
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, password_hash=None):
+        """Pass `password_hash` instead of `password` when the hash was computed
+        ahead of time (e.g. by App.hashing.hash_passwords for bulk creation)."""
         self.userID = str(uuid.uuid4())
         self.username = username
-        self.set_password(password)
+        if password_hash is not None:
+            self.password = password_hash
+        else:
+            self.set_password(password)
 
     def get_json(self):
         return{
@@ -32,11 +37,11 @@ class User(db.Model):
 
     def set_password(self, password):
         """Create hashed password."""
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
     
     def check_password(self, password):
         """Check hashed password."""
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
 
     @staticmethod
     def login(username: str, password: str) -> bool:
@@ -0,0 +1,169 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from App.database import db
+from App.models import LeaderBoardEntry, LeaderboardEvent, User
+
+RANKING_MODES = ('competition', 'dense')
+# Catching up on more events than this is slower than reloading the board
+MAX_CATCH_UP = 1000
+
+
+class RankIndex:
+    """Per-process sorted index of the leaderboard for O(log N) rank lookups.
+
+    Entries are kept as (-totalHours, studentID), i.e. in board order. The
+    index is loaded at startup (see gunicorn_config.py) and a background
+    refresher keeps it current by applying the LeaderboardEvent feed, which
+    every worker's confirmations write to, so lookups only read memory. In a
+    process without the refresher (development server, CLI) each lookup
+    catches up first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()          # guards the index structures
+        self._refresh_lock = threading.Lock()  # one load or catch-up at a time
+        self._order = []      # (-totalHours, studentID), best first
+        self._distinct = []   # distinct -totalHours values, best first
+        self._counts = {}     # totalHours -> number of students with it
+        self._hours = {}      # studentID -> totalHours
+        self._usernames = {}  # studentID -> username
+        self._seen = {}       # eventID -> created, for events inside the overlap window
+        self.last_event_id = None
+        self._thread = None
+
+    def load(self):
+        """Rebuild the index from LeaderBoardEntry. Everything is read before
+        the index is locked, so lookups carry on meanwhile."""
+        with self._refresh_lock:
+            self._load()
+
+    def _load(self):
+        window_start = datetime.utcnow() - timedelta(seconds=current_app.config['LEADERBOARD_EVENT_OVERLAP'])
+        # Read the feed position first: events racing the load are re-applied, which is harmless
+        last_event_id = db.session.scalar(db.select(db.func.max(LeaderboardEvent.eventID))) or 0
+        seen = dict(db.session.execute(
+            db.select(LeaderboardEvent.eventID, LeaderboardEvent.created)
+            .where(LeaderboardEvent.created >= window_start)
+        ).all())
+        rows = db.session.execute(
+            db.select(LeaderBoardEntry.studentID, LeaderBoardEntry.totalHours, User.username)
+            .join(User, User.userID == LeaderBoardEntry.studentID)
+        ).all()
+        hours = {row.studentID: row.totalHours for row in rows}
+        counts = {}
+        for total in hours.values():
+            counts[total] = counts.get(total, 0) + 1
+        with self._lock:
+            self._hours = hours
+            self._usernames = {row.studentID: row.username for row in rows}
+            self._order = sorted((-total, student_id) for student_id, total in hours.items())
+            self._counts = counts
+            self._distinct = sorted(-total for total in counts)
+            self._seen = seen
+            self.last_event_id = last_event_id
+
+    def _remove(self, student_id):
+        hours = self._hours.pop(student_id)
+        del self._order[bisect_left(self._order, (-hours, student_id))]
+        self._counts[hours] -= 1
+        if not self._counts[hours]:
+            del self._counts[hours]
+            del self._distinct[bisect_left(self._distinct, -hours)]
+
+    def _set(self, student_id, hours):
+        if student_id in self._hours:
+            if self._hours[student_id] == hours:
+                return
+            self._remove(student_id)
+        self._hours[student_id] = hours
+        insort(self._order, (-hours, student_id))
+        if hours not in self._counts:
+            self._counts[hours] = 0
+            insort(self._distinct, -hours)
+        self._counts[hours] += 1
+
+    def catch_up(self):
+        """Apply leaderboard events recorded since the last load or catch-up,
+        including late ones (see LeaderboardEvent.since). Reloads instead
+        after a rebuild, a long backlog, or when unseen events were pruned."""
+        with self._refresh_lock:
+            if self.last_event_id is None:
+                return self._load()
+            overlap = current_app.config['LEADERBOARD_EVENT_OVERLAP']
+            events = LeaderboardEvent.since(self.last_event_id, self._seen, overlap, limit=MAX_CATCH_UP + 1)
+            window_start = datetime.utcnow() - timedelta(seconds=overlap)
+            if events:
+                newer = sum(1 for event in events if event.eventID > self.last_event_id)
+                oldest = db.session.scalar(db.select(db.func.min(LeaderboardEvent.eventID)))
+                # A full rebuild, a long backlog, or events pruned before this index saw them
+                if newer > MAX_CATCH_UP or any(event.studentID is None for event in events) \
+                        or oldest > self.last_event_id + 1:
+                    return self._load()
+                unknown = {event.studentID for event in events} - self._usernames.keys()
+                usernames = dict(db.session.execute(
+                    db.select(User.userID, User.username).where(User.userID.in_(unknown))
+                ).all()) if unknown else {}
+                with self._lock:
+                    self._usernames.update(usernames)
+                    for event in events:
+                        self._set(event.studentID, event.totalHours)
+                        self._seen[event.eventID] = event.created
+                    self.last_event_id = max(self.last_event_id, events[-1].eventID)
+            self._seen = {event_id: created for event_id, created in self._seen.items() if created >= window_start}
+
+    def start(self, app):
+        """Load the index and keep it current from a background thread."""
+        if self._thread is None:
+            interval = app.config['RANK_INDEX_REFRESH_INTERVAL']
+            self._thread = threading.Thread(target=self._run, args=(app, interval), name='rank-index', daemon=True)
+            self._thread.start()
+
+    def _run(self, app, interval):
+        while True:
+            with app.app_context():
+                try:
+                    self.catch_up()
+                except Exception as e:
+                    print(f"Rank index refresh error: {e}")
+                finally:
+                    db.session.remove()
+            time.sleep(interval)
+
+    def _rank(self, hours, mode):
+        if mode == 'dense':
+            return bisect_left(self._distinct, -hours) + 1
+        # Competition ("1224") ranking: one more than the number of students with more hours
+        return bisect_left(self._order, (-hours,)) + 1
+
+    def _describe(self, student_id, mode):
+        hours = self._hours[student_id]
+        return {'studentID': student_id, 'username': self._usernames.get(student_id),
+                'total_hours': hours, 'rank': self._rank(hours, mode)}
+
+    def lookup(self, student_id, k=0, mode='competition'):
+        """The student's rank plus the `k` students directly above and below
+        in board order, or None if the student has no leaderboard entry."""
+        if mode not in RANKING_MODES:
+            raise ValueError(f'Unknown ranking mode {mode}')
+        if self._thread is None:
+            self.catch_up()
+        with self._lock:
+            if student_id not in self._hours:
+                return None
+            position = bisect_left(self._order, (-self._hours[student_id], student_id))
+            above = self._order[max(0, position - k):position]
+            below = self._order[position + 1:position + 1 + k]
+            return {
+                **self._describe(student_id, mode),
+                'ranking': mode,
+                'above': [self._describe(entry_id, mode) for _, entry_id in above],
+                'below': [self._describe(entry_id, mode) for _, entry_id in below]
+            }
+
+
+rank_index = RankIndex()
@@ -0,0 +1,112 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+
+from App.database import db
+
+# Stats of the request (or benchmark) currently collecting, if any. A
+# ContextVar is per-greenlet under gevent, so concurrent requests never mix.
+_current = ContextVar('sql_stats', default=None)
+
+# Expanded IN lists and multi-row VALUES differ only in their placeholder
+# count; collapse them so they group as one statement shape
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+
+
+class QueryStats:
+    """Statements executed and time spent in the database during one unit of work."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def repeated(self, threshold):
+        """(statement, count) for every shape executed more than `threshold` times."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def statement_shape(statement):
+    return _PLACEHOLDER_LIST.sub('(?)', ' '.join(statement.split()))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        # Kept on the statement's own execution context rather than the
+        # connection, so a statement that raises leaves nothing behind
+        context._sql_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, '_sql_stats_started', None)
+    if stats is None or started is None:
+        return
+    stats.duration += time.perf_counter() - started
+    stats.count += 1
+    stats.shapes[statement_shape(statement)] += 1
+
+
+def instrument(engine):
+    """Attach the statement listeners to `engine` (once). Until this is called
+    nothing is timed and the only cost is SQLAlchemy's own."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+@contextmanager
+def collect():
+    """Collect QueryStats for the statements executed inside the block."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def setup_sql_stats(app):
+    """Report each request's statement count and database time in the
+    X-DB-Queries and Server-Timing headers, and warn when one statement shape
+    repeats more than SQL_STATS_REPEAT_THRESHOLD times (an N+1 pattern).
+    Registers nothing unless SQL_STATS_ENABLED is set."""
+    if not app.config['SQL_STATS_ENABLED']:
+        return
+    with app.app_context():
+        instrument(db.engine)
+    threshold = app.config['SQL_STATS_REPEAT_THRESHOLD']
+
+    @app.before_request
+    def start_sql_stats():
+        stats = QueryStats()
+        g._sql_stats = stats
+        g._sql_stats_token = _current.set(stats)
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.get('_sql_stats')
+        if stats is None:
+            return response
+        response.headers['X-DB-Queries'] = str(stats.count)
+        response.headers.add('Server-Timing', f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries"')
+        for shape, count in stats.repeated(threshold):
+            app.logger.warning('%s %s executed %d similar statements (possible N+1): %s',
+                               request.method, request.path, count, shape[:200])
+        return response
+
+    @app.teardown_request
+    def stop_sql_stats(exc=None):
+        token = g.pop('_sql_stats_token', None)
+        g.pop('_sql_stats', None)
+        if token is not None:
+            _current.reset(token)
@@ -0,0 +1,52 @@
+import os
+import re
+import subprocess
+import sys
+
+# Cold-start budget for importing wsgi (which also builds the app), enforced by the
+# tests and reported by `flask startup-profile`. It leaves room for slower machines;
+# set IMPORT_BUDGET_MS in the environment to change it (e.g. on a loaded CI runner)
+IMPORT_BUDGET_MS = int(os.environ.get('IMPORT_BUDGET_MS', 1000))
+# Imported on first use rather than at startup; none of these may load with the app
+DEFERRED_MODULES = ('flask_admin', 'flask_uploads', 'wtforms', 'numpy', 'pytest', 'alembic')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+def profile_imports(module='wsgi', env=None):
+    """Import `module` in a fresh interpreter under `-X importtime` and return
+    one (module, self_us, cumulative_us, depth) entry per import, in the
+    order they finished. `env` adds to (or overrides) the environment."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, env={**os.environ, **(env or {})},
+        capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(f'Importing {module} failed:\n{result.stderr[-2000:]}')
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def summarize_imports(entries, top=15):
+    """Total import time, the `top` packages by self time summed over their
+    submodules, and the `top` slowest individual modules (by cumulative time)."""
+    packages = {}
+    for name, self_us, _, _ in entries:
+        root = name.split('.')[0]
+        packages[root] = packages.get(root, 0) + self_us
+    ranked_packages = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    ranked_modules = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    return {
+        'total_ms': round(sum(self_us for _, self_us, _, _ in entries) / 1000, 1),
+        'modules': len(entries),
+        'packages': [{'package': name, 'ms': round(us / 1000, 1)} for name, us in ranked_packages],
+        'slowest': [{'module': name, 'self_ms': round(self_us / 1000, 1), 'cumulative_ms': round(cumulative_us / 1000, 1)}
+                    for name, self_us, cumulative_us, _ in ranked_modules]
+    }
@@ -1,16 +1,45 @@
-import os, tempfile, pytest, logging, unittest
+import os, io, tempfile, pytest, logging, unittest, queue, json, time, threading
+import numpy as np
+from datetime import date, datetime, timedelta
+from flask import Flask, current_app
 from werkzeug.security import check_password_hash, generate_password_hash
 
-from App.main import create_app
-from App.database import db, create_db
-from App.models import User, ActivityLog, Accolade, LeaderBoardEntry, Staff
+from App.main import create_app, defer_until_first_request
+from App.database import db, create_db, engine_options, unit_of_work, in_unit_of_work
+from sqlalchemy import event as sa_event
+from sqlalchemy.exc import IntegrityError, OperationalError
+from App.cache import user_cache
+from App.hashing import needs_rehash
+from App.events import LeaderboardBroadcaster, events_since
+from App.jobs import JobRunner
+from App.rankindex import RankIndex
+from App.sqlstats import instrument, collect
+from App.memory import process_memory, workers_that_fit
+from App.startup import profile_imports, summarize_imports, IMPORT_BUDGET_MS, DEFERRED_MODULES
+from App.models import User, ActivityLog, Accolade, LeaderBoardEntry, Staff, Milestone, Job, DailyRollup, LeaderboardEvent, ImportCheckpoint
 from App.controllers import (
     create_user,
     get_all_users_json,
     login,
     get_user,
     get_user_by_username,
-    update_user
+    update_user,
+    update_leaderboard,
+    staff_log_hours,
+    staff_log_hours_bulk,
+    staff_confirm_hours_batch,
+    award_accolades,
+    get_cached_user,
+    create_users,
+    get_users_page,
+    view_leaderboard,
+    leaderboard_cursor,
+    import_records,
+    get_job,
+    student_rank,
+    leaderboard_window,
+    rebuild_daily_rollups,
+    summarize_hours
 )
 
 
@@ -39,6 +68,64 @@ class UserUnitTests(unittest.TestCase):
     def test_accolade_creation(self):
         accolade = Accolade.createAccolade("50 Hour Milestone", 50)
         self.assertEqual(accolade.milestoneHours, 50)
+        student = create_user("accolade_student", "pass", user_type="student")
+        for _ in range(2):
+            Accolade.awardAccolade(student.studentID, accolade.accoladeID)
+        self.assertEqual([(a.accoladeID, a.name) for a in student.viewAccolades()],
+                         [(Accolade.makeID(student.studentID, 50), "50 Hour Milestone")])
+
+    def test_milestones_crossed(self):
+        crossed = [hours for hours, _ in Milestone.crossed(8, 30)]
+        self.assertEqual(crossed, [10, 25])
+        self.assertEqual(Milestone.crossed(10, 24), [])
+        # A milestone added by another process is picked up once the cache expires
+        db.session.add(Milestone(20))
+        db.session.commit()
+        self.assertEqual(Milestone.crossed(10, 24), [])
+        Milestone._loaded -= current_app.config['MILESTONE_CACHE_TTL'] + 1
+        self.assertEqual([hours for hours, _ in Milestone.crossed(10, 24)], [20])
+        db.session.delete(db.session.get(Milestone, 20))
+        db.session.commit()
+        Milestone.reset()
+
+    def test_leaderboard_window_bounds(self):
+        today = date(2025, 3, 12)
+        self.assertEqual(leaderboard_window('week', today=today), (date(2025, 3, 10), today))
+        self.assertEqual(leaderboard_window('month', today=today), (date(2025, 3, 1), today))
+        self.assertEqual(leaderboard_window('term', today=today), (date(2025, 1, 15), today))
+        self.assertEqual(leaderboard_window('term', today=date(2025, 1, 3))[0], date(2024, 9, 1))
+        with self.assertRaises(ValueError):
+            leaderboard_window('custom', start=today, end=date(2025, 1, 1))
+        with self.assertRaises(ValueError):
+            leaderboard_window('year', today=today)
+
+    def test_summarize_hours(self):
+        # Two students with confirmed logs (grouped, oldest first) and one without
+        students = np.array([0, 0, 0, 1])
+        hours = np.array([6, 6, 20, 30])
+        days = np.array([0, 4, 10, 3]) * 86400
+        stats = summarize_hours(students, hours, days, 3, [(10, "Ten"), (25, "Twenty-five")])
+        self.assertEqual((stats['students'], stats['total_hours'], stats['percentiles']['p50']), (3, 62, 30.0))
+        self.assertEqual([bucket['students'] for bucket in stats['histogram']], [1, 0, 2])
+        self.assertEqual([(m['students'], m['median_days_to_reach']) for m in stats['milestones']],
+                         [(2, 2.0), (2, 5.0)])
+
+    def test_worker_memory_split(self):
+        memory = process_memory(os.getpid())
+        self.assertAlmostEqual(memory['unique'] + memory['shared'], memory['rss'], delta=1)
+        self.assertLessEqual(memory['pss'], memory['rss'])
+        self.assertEqual(workers_that_fit(1024, 100, 50), 18)
+        self.assertEqual(workers_that_fit(100, 100, 50), 1)
+
+    def test_engine_options_budget(self):
+        config = {'SQLALCHEMY_DATABASE_URI': 'postgresql://localhost/app', 'WEB_WORKERS': 4,
+                  'WORKER_CONNECTIONS': 1000, 'DB_MAX_CONNECTIONS': 80, 'DB_POOL_TIMEOUT': 10,
+                  'DB_POOL_RECYCLE': 1800, 'SQLALCHEMY_ENGINE_OPTIONS': {'pool_recycle': 300}}
+        options = engine_options(config)
+        self.assertEqual((options['pool_size'], options['max_overflow']), (10, 10))
+        self.assertEqual(options['pool_recycle'], 300)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertEqual(engine_options({**config, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///x.db'}), {'pool_recycle': 300})
 
     def test_leaderboard_entry_update(self):
         user = User("john", "johnpass")
@@ -59,6 +146,220 @@ def empty_db():
     yield app.test_client()
     db.drop_all()
 
+def test_leaderboard_etag(empty_db):
+    client = empty_db
+    first = client.get('/api/leaderboard')
+    etag = first.headers['ETag']
+    assert client.get('/api/leaderboard', headers={'If-None-Match': etag}).status_code == 304
+    create_user("etag_staff", "pass", user_type="staff")
+    student = create_user("etag_student", "pass", user_type="student")
+    # A new student is a new leaderboard row
+    created = client.get('/api/leaderboard', headers={'If-None-Match': etag})
+    assert created.status_code == 200
+    etag = created.headers['ETag']
+    update_user(student.userID, "etag_renamed")
+    assert client.get('/api/leaderboard', headers={'If-None-Match': etag}).status_code == 200
+    etag = client.get('/api/leaderboard').headers['ETag']
+    client.post('/api/log_hours', json={'staff_username': 'etag_staff', 'student_username': 'etag_renamed',
+                                        'hours': 2, 'activity': 'Cleanup'})
+    changed = client.get('/api/leaderboard', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+def test_bulk_log_hours_body(empty_db):
+    client = empty_db
+    assert client.post('/api/log_hours/bulk', json=[{'student_username': 'ivan'}]).status_code == 400
+    assert client.post('/api/log_hours/bulk', json={'staff_username': None, 'entries': []}).status_code == 400
+    assert client.put('/api/staff/confirm_hours/batch', json=['log']).status_code == 400
+    assert client.put('/api/staff/reject_hours/batch', json={'activity_log_ids': [['log']]}).status_code == 400
+
+def test_metrics_endpoint(empty_db):
+    client = empty_db
+    client.get('/health')
+    client.get('/api/leaderboard')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_requests_total{blueprint="index_views",endpoint="index_views.health_check",method="GET",status="200"}' in body
+    assert 'http_request_duration_seconds_count{blueprint="api_admin_views",endpoint="api_admin_views.api_view_leaderboard"' in body
+    assert 'db_pool_checkout_wait_seconds_count' in body
+
+def test_export_activity_logs(empty_db):
+    client = empty_db
+    student = create_user("export_student", "pass", user_type="student")
+    log = Staff.logHoursForStudent(student.studentID, 6, "Beach Cleanup")
+    lines = client.get(f'/api/export/activity_logs?format=jsonl&status=logged&since={log.dateLogged.date()}').get_data(as_text=True).splitlines()
+    exported = [json.loads(line) for line in lines]
+    row = next(row for row in exported if row['logID'] == log.logID)
+    assert (row['username'], row['hoursLogged']) == ('export_student', 6)
+    assert all(row['status'] == 'logged' for row in exported)
+    csv_body = client.get('/api/export/activity_logs?status=rejected&until=2000-01-01').get_data(as_text=True)
+    assert csv_body.strip() == 'logID,username,studentID,hoursLogged,dateLogged,status,description'
+    assert client.get('/api/export/activity_logs?since=yesterday').status_code == 400
+
+def test_windowed_leaderboard(empty_db):
+    client = empty_db
+    student = create_user("window_student", "pass", user_type="student")
+    create_user("window_staff", "pass", user_type="staff")
+    old, recent, batch = [Staff.logHoursForStudent(student.studentID, hours, "Food Bank") for hours in (40, 3, 2)]
+    old.dateLogged = datetime(2024, 2, 1)
+    for log in (old, recent, batch):
+        log.status = "pending"
+    db.session.commit()
+    Staff.confirmHours(None, old.logID)
+    Staff.confirmHours(None, recent.logID)
+    staff_confirm_hours_batch("window_staff", [batch.logID])
+    rollups = {row.day: row.hours for row in DailyRollup.query.filter_by(studentID=student.studentID)}
+    assert rollups == {date(2024, 2, 1): 40, recent.dateLogged.date(): 5}
+    rebuild_daily_rollups()
+    assert {row.day: row.hours for row in DailyRollup.query.filter_by(studentID=student.studentID)} == rollups
+    february = client.get('/api/leaderboard?window=custom&start=2024-02-01&end=2024-02-29').get_json()
+    assert {'username': 'window_student', 'studentID': student.studentID, 'total_hours': 40} in february
+    this_week = client.get('/api/leaderboard?window=week').get_json()
+    assert next(row['total_hours'] for row in this_week if row['username'] == 'window_student') == 5
+    assert client.get('/api/leaderboard?window=custom&start=someday').status_code == 400
+
+def test_hours_stats_endpoint(empty_db):
+    client = empty_db
+    student = create_user("stats_student", "pass", user_type="student")
+    create_user("stats_staff", "pass", user_type="staff")
+    log = Staff.logHoursForStudent(student.studentID, 12, "Mentoring")
+    log.status = "pending"
+    db.session.commit()
+    before = client.get('/api/stats/hours')
+    staff_confirm_hours_batch("stats_staff", [log.logID])
+    after = client.get('/api/stats/hours', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    stats = after.get_json()
+    assert stats['confirmed_logs'] == before.get_json()['confirmed_logs'] + 1
+    assert stats['total_hours'] == before.get_json()['total_hours'] + 12
+    assert client.get('/api/stats/hours').get_json() == stats
+
+def test_background_jobs(empty_db):
+    client = empty_db
+    first = Job.enqueue('update_leaderboard')
+    assert Job.enqueue('update_leaderboard').jobID == first.jobID
+    # The unique index is what stops two racing enqueues from both inserting
+    with pytest.raises(IntegrityError):
+        db.session.add(Job(jobID='racing', kind='update_leaderboard', params={}, status='queued',
+                           coalesceKey=first.coalesceKey, created=datetime.utcnow()))
+        db.session.commit()
+    db.session.rollback()
+    failing = Job.enqueue('import', {'kind': 'logs', 'path': '/nonexistent.csv'})
+    runner = JobRunner()
+    while runner.run_next():
+        pass
+    assert (get_job(first.jobID).status, get_job(failing.jobID).status) == ('done', 'failed')
+    assert get_job(failing.jobID).error.startswith('FileNotFoundError')
+    # A job whose worker died while running it is queued again after the timeout
+    abandoned = Job.enqueue('update_leaderboard')
+    assert Job.claimNext(timeout=60).jobID == abandoned.jobID
+    assert Job.claimNext(timeout=60) is None
+    db.session.execute(db.update(Job).filter_by(jobID=abandoned.jobID)
+                       .values(started=datetime.utcnow() - timedelta(seconds=120)))
+    db.session.commit()
+    assert Job.claimNext(timeout=60).jobID == abandoned.jobID
+    Job.finish(abandoned.to_json(), result=None)
+    # Queueing a job inside a unit of work commits the job alone, not the unit's pending writes
+    with unit_of_work():
+        db.session.add(Job(jobID='pending', kind='update_leaderboard', params={}, status='done',
+                           created=datetime.utcnow()))
+        queued = Job.enqueue('update_leaderboard')
+        db.session.rollback()
+    assert get_job('pending') is None and get_job(queued.jobID).status == 'queued'
+    Job.finish({**queued.to_json(), 'started': None}, result=None)
+
+    create_user("job_staff", "pass", user_type="staff")
+    staff = {'Authorization': f'Bearer {login("job_staff", "pass")}'}
+    response = client.put('/api/update_leaderboard', headers=staff)
+    assert response.status_code == 202
+    job_url = response.headers['Location']
+    for _ in range(50):
+        status = client.get(job_url).json['status']
+        if status == 'done':
+            break
+        time.sleep(0.1)
+    assert status == 'done'
+    assert client.get('/api/jobs/missing').status_code == 404
+    # Rebuilding, importing and resetting the schema are for staff only
+    create_user("job_student", "pass", user_type="student")
+    student = {'Authorization': f'Bearer {login("job_student", "pass")}'}
+    for method, url in (('put', '/api/update_leaderboard'), ('post', '/api/import/staff'), ('post', '/api/initialize')):
+        assert getattr(client, method)(url).status_code == 401
+        assert getattr(client, method)(url, headers=student).status_code == 401
+    # Uploads over MAX_CONTENT_LENGTH are refused before anything is saved or queued
+    current_app.config['MAX_CONTENT_LENGTH'] = 1024
+    try:
+        response = client.post('/api/import/staff', headers=staff,
+                               data={'file': (io.BytesIO(b'x' * 2048), 'staff.csv')})
+    finally:
+        current_app.config['MAX_CONTENT_LENGTH'] = 64 * 1024 * 1024
+    assert response.status_code == 413
+
+def test_users_keyset_pages(empty_db):
+    seen, cursor = [], None
+    while True:
+        users, cursor = get_users_page(limit=2, after=cursor)
+        seen.extend(user['username'] for user in users)
+        if cursor is None:
+            break
+    assert seen == [user['username'] for user in get_all_users_json()]
+    assert seen == sorted(seen)
+    # Out-of-range page sizes are clamped rather than failing or loading everything
+    assert empty_db.get('/users?limit=0').status_code == 200
+    assert empty_db.get('/users?limit=100000').status_code == 200
+    # The Next link keeps the page size, and the API refuses one that isn't a number
+    assert 'limit=1' in empty_db.get('/users?limit=1').get_data(as_text=True)
+    assert empty_db.get('/api/users?limit=abc').status_code == 400
+
+def test_sql_stats_collect():
+    instrument(db.engine)
+    with collect() as stats:
+        for username in ("bob", "alice", "nobody"):
+            get_user_by_username(username)
+        db.session.execute(db.select(User).where(User.userID.in_([1, 2, 3]))).all()
+        db.session.execute(db.select(User).where(User.userID.in_([1, 2]))).all()
+    assert stats.count == 5
+    assert sorted(stats.shapes.values()) == [2, 3]
+    assert len(stats.repeated(2)) == 1
+    # A statement that raises is neither counted nor leaves its start time behind
+    with collect() as failed, db.engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(db.text('SELECT * FROM no_such_table'))
+        conn.rollback()
+        conn.execute(db.select(User.userID)).all()
+        assert not conn.info.get('_sql_stats_started')
+    assert failed.count == 1
+
+def test_sqlite_profile_readers_not_blocked():
+    assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+    assert db.session.execute(db.text('PRAGMA busy_timeout')).scalar() == 5000
+    with db.engine.connect() as writer, db.engine.connect() as reader:
+        writer.execute(db.update(User).values(username=User.username))
+        # A reader is not blocked by the open write transaction
+        assert reader.execute(db.select(db.func.count(User.userID))).scalar() >= 0
+        writer.rollback()
+
+def test_startup_import_budget():
+    # A fresh interpreter importing wsgi is what every worker and CLI command pays
+    entries = profile_imports('wsgi', env={'FLASK_SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    loaded = {name.split('.')[0] for name, *_ in entries}
+    assert not loaded & set(DEFERRED_MODULES)
+    assert summarize_imports(entries)['total_ms'] < IMPORT_BUDGET_MS
+
+def test_deferred_setup_holds_requests():
+    app = Flask('deferred')
+    started = threading.Event()
+    def slow_setup(app):
+        started.set()
+        time.sleep(0.2)
+        app.add_url_rule('/late', 'late', lambda: 'late')
+    defer_until_first_request(app, slow_setup)
+    first = threading.Thread(target=app.test_client().get, args=('/late',))
+    first.start()
+    started.wait()
+    # A request arriving mid-setup waits for it instead of seeing a half-built app
+    assert app.test_client().get('/late').status_code == 200
+    first.join()
+
 def test_authenticate():
     user = create_user("bob", "bobpass")
     assert login("bob", "bobpass") != None
@@ -103,11 +404,263 @@ class UsersIntegrationTests(unittest.TestCase):
         entry = LeaderBoardEntry.query.filter_by(studentID=student1.studentID).first()
         self.assertEqual(entry.totalHours, 50)
 
+    def test_leaderboard_pagination(self):
+        student = create_user("grace", "gracepass", user_type="student")
+        log = Staff.logHoursForStudent(student.studentID, 7, "Tutoring")
+        log.status = "pending"
+        db.session.commit()
+        Staff.confirmHours(self, log.logID)
+        full = view_leaderboard()
+        hours = [entry['total_hours'] for entry in full]
+        self.assertEqual(hours, sorted(hours, reverse=True))
+        self.assertIn({'username': 'grace', 'studentID': student.studentID, 'total_hours': 7, 'accolades': 0}, full)
+        self.assertEqual(view_leaderboard(limit=2, offset=1), full[1:3])
+        first_page = view_leaderboard(limit=2)
+        self.assertEqual(view_leaderboard(limit=2, cursor=leaderboard_cursor(first_page[-1])), full[2:4])
+        for cursor in ("5", "5:", "x:abc"):
+            with self.assertRaises(ValueError):
+                view_leaderboard(limit=2, cursor=cursor)
+
+    def test_leaderboard_incremental_ranks(self):
+        student = create_user("heidi", "heidipass", user_type="student")
+        log = Staff.logHoursForStudent(student.studentID, 500, "Camp Counsellor")
+        log.status = "pending"
+        db.session.commit()
+        Staff.confirmHours(self, log.logID)
+        entries = LeaderBoardEntry.query.order_by(LeaderBoardEntry.rank).all()
+        self.assertEqual(entries[0].studentID, student.studentID)
+        self.assertEqual([e.rank for e in entries], list(range(1, len(entries) + 1)))
+        incremental = [(e.studentID, e.rank) for e in entries]
+        # Called directly (outside a unit of work) updateEntry commits its change
+        student.totalHours += 1
+        LeaderBoardEntry.updateEntry(student)
+        db.session.rollback()
+        self.assertEqual(LeaderBoardEntry.query.filter_by(studentID=student.studentID).one().totalHours, 501)
+        update_leaderboard()
+        rebuilt = [(e.studentID, e.rank) for e in LeaderBoardEntry.query.order_by(LeaderBoardEntry.rank).all()]
+        self.assertEqual(incremental, rebuilt[:len(incremental)])
+
+    def test_rank_index_lookups(self):
+        index = RankIndex()
+        students = [create_user(f"rank_{name}", "pass", user_type="student") for name in "abc"]
+
+        def confirm(student, hours):
+            log = Staff.logHoursForStudent(student.studentID, hours, "Tutoring")
+            log.status = "pending"
+            db.session.commit()
+            Staff.confirmHours(self, log.logID)
+
+        def expected_rank(student, dense):
+            hours = [entry.totalHours for entry in LeaderBoardEntry.query]
+            mine = LeaderBoardEntry.query.filter_by(studentID=student.studentID).first().totalHours
+            higher = [h for h in hours if h > mine]
+            return len(set(higher) if dense else higher) + 1
+
+        for student, hours in zip(students, (20, 20, 5)):
+            confirm(student, hours)
+        for student in students:
+            for mode in ('competition', 'dense'):
+                self.assertEqual(index.lookup(student.studentID, mode=mode)['rank'], expected_rank(student, mode == 'dense'))
+        # Later confirmations reach the already loaded index through the event feed
+        confirm(students[2], 100)
+        result = index.lookup(students[2].studentID, k=2)
+        self.assertEqual((result['total_hours'], result['rank']), (105, expected_rank(students[2], False)))
+        self.assertTrue(all(n['total_hours'] >= 105 for n in result['above']))
+        self.assertTrue(all(n['total_hours'] <= 105 for n in result['below']))
+        self.assertEqual(student_rank("rank_c", mode='dense')['rank'], expected_rank(students[2], True))
+        self.assertIsNone(student_rank("nobody"))
+        # With the background refresher running, lookups are answered from memory alone
+        refreshed = RankIndex()
+        app = current_app._get_current_object()
+        interval = app.config['RANK_INDEX_REFRESH_INTERVAL']
+        app.config['RANK_INDEX_REFRESH_INTERVAL'] = 3600
+        refreshed.start(app)
+        app.config['RANK_INDEX_REFRESH_INTERVAL'] = interval
+        for _ in range(50):
+            if refreshed.last_event_id is not None:
+                break
+            time.sleep(0.05)
+        instrument(db.engine)
+        with collect() as stats:
+            self.assertEqual(refreshed.lookup(students[2].studentID)['total_hours'], 105)
+        self.assertEqual(stats.count, 0)
+
+    def test_user_cache_invalidation(self):
+        user = create_user("mallory", "mallorypass")
+        self.assertEqual(get_cached_user(user.userID).username, "mallory")
+        hits = user_cache.hits
+        self.assertEqual(get_cached_user(user.userID).username, "mallory")
+        self.assertEqual(user_cache.hits, hits + 1)
+        update_user(user.userID, "mallory2")
+        self.assertIsNone(user_cache.get(user.userID))
+        self.assertEqual(get_cached_user(user.userID).username, "mallory2")
+
+    def test_bulk_create_and_rehash_on_login(self):
+        users = create_users([("nina", "ninapass"), ("oscar", "oscarpass"), ("bob", "bobpass")], user_type="student")
+        self.assertEqual(sorted(u.username for u in users), ["nina", "oscar"])
+        nina = get_user_by_username("nina")
+        nina.password = generate_password_hash("ninapass", "pbkdf2:sha256:1000")
+        db.session.commit()
+        self.assertTrue(needs_rehash(nina.password))
+        self.assertIsNotNone(login("nina", "ninapass"))
+        self.assertFalse(needs_rehash(get_user_by_username("nina").password))
+
+    def test_leaderboard_broadcast(self):
+        student = create_user("peggy", "peggypass", user_type="student")
+        broadcaster = LeaderboardBroadcaster()
+        broadcaster.poll_once()
+        subscriber = queue.Queue()
+        broadcaster._subscribers.add(subscriber)
+        log = Staff.logHoursForStudent(student.studentID, 12, "Tree Planting")
+        log.status = "pending"
+        db.session.commit()
+        Staff.confirmHours(self, log.logID)
+        self.assertEqual(broadcaster.poll_once(), 1)
+        event = subscriber.get_nowait()
+        self.assertEqual((event['type'], event['studentID'], event['total_hours']), ('rank', student.studentID, 12))
+        # Pruning every event must not let new ones reuse IDs the poller has passed
+        LeaderboardEvent.prune(-60)
+        db.session.commit()
+        log = Staff.logHoursForStudent(student.studentID, 3, "Tree Planting")
+        log.status = "pending"
+        db.session.commit()
+        Staff.confirmHours(self, log.logID)
+        self.assertEqual(broadcaster.poll_once(), 1)
+        # Writers prune expired events themselves once the retention period has passed
+        expired = datetime.utcnow() - timedelta(seconds=current_app.config['LEADERBOARD_EVENT_RETENTION'] + 60)
+        stale = LeaderboardEvent(studentID=student.studentID, totalHours=0, rank=0, created=expired)
+        db.session.add(stale)
+        db.session.flush()
+        stale_id = stale.eventID
+        LeaderboardEvent._last_prune = None
+        LeaderboardEvent.recordRebuild()
+        db.session.commit()
+        self.assertEqual(LeaderboardEvent.query.filter(LeaderboardEvent.created <= expired).count(), 0)
+        # An event committed after higher IDs were read is still published, once
+        broadcaster.poll_once()
+        db.session.add(LeaderboardEvent(eventID=stale_id, studentID=student.studentID, totalHours=15, rank=1,
+                                        created=datetime.utcnow()))
+        db.session.commit()
+        self.assertEqual(broadcaster.poll_once(), 1)
+        self.assertEqual(broadcaster.poll_once(), 0)
+        # A replay longer than the limit becomes a single rebuild marker
+        self.assertEqual([event['type'] for event in events_since(0, limit=1)], ['rebuild'])
+
+    def test_unit_of_work(self):
+        student = create_user("uow_student", "pass", user_type="student")
+        create_user("uow_staff", "pass", user_type="staff")
+        commits = []
+        count_commit = lambda session: commits.append(session)
+        sa_event.listen(db.session, 'after_commit', count_commit)
+        try:
+            # Version bump, log insert and the controller's own write: one commit
+            log = staff_log_hours("uow_staff", "uow_student", 4, "Shelter")
+            self.assertEqual(len(commits), 1)
+            with self.assertRaises(RuntimeError):
+                with unit_of_work():
+                    doomed = Staff.logHoursForStudent(student.studentID, 9, "Rolled back")
+                    with unit_of_work():
+                        Accolade.createAccolade("Rolled back", 99)
+                    raise RuntimeError
+            self.assertEqual(len(commits), 1)
+        finally:
+            sa_event.remove(db.session, 'after_commit', count_commit)
+        self.assertIsNotNone(db.session.get(ActivityLog, log.logID))
+        self.assertEqual(ActivityLog.query.filter_by(description="Rolled back").count(), 0)
+        self.assertEqual(Accolade.query.filter_by(name="Rolled back").count(), 0)
+        # A per-request unit is discarded when the view answers with an error
+        def failing_view():
+            Staff.logHoursForStudent(student.studentID, 2, "Bad request")
+            return '', 400
+        with current_app.test_request_context():
+            self.assertEqual(in_unit_of_work(failing_view)().status_code, 400)
+        self.assertEqual(ActivityLog.query.filter_by(description="Bad request").count(), 0)
+
     def test_staff_authentication(self):
         staff = create_user("eve", "evepass", user_type="staff")
         token = login("eve", "evepass")
         self.assertIsNotNone(token)
     
+    def test_bulk_log_hours(self):
+        create_user("ivan", "ivanpass", user_type="student")
+        create_user("judy", "judypass", user_type="student")
+        create_user("admin5", "adminpass5", user_type="staff")
+        result = staff_log_hours_bulk("admin5", [
+            {"student_username": "ivan", "hours": 3, "activity": "Food Drive"},
+            {"student_username": "nobody", "hours": 3, "activity": "Food Drive"},
+            {"student_username": "judy", "hours": "four", "activity": "Food Drive"},
+            {"student_username": "judy", "hours": "4", "activity": "Food Drive"},
+            {"student_username": ["judy"], "hours": 1, "activity": "Food Drive"},
+            {"student_username": "judy", "hours": 1, "activity": None}
+        ])
+        self.assertEqual([row['index'] for row in result['created']], [0, 3])
+        self.assertEqual([row['index'] for row in result['errors']], [1, 2, 4, 5])
+        log = ActivityLog.query.filter_by(logID=result['created'][1]['logID']).first()
+        self.assertEqual((log.hoursLogged, log.status), (4, "logged"))
+        self.assertIsNone(staff_log_hours_bulk("nobody", []))
+
+    def test_batch_confirm_hours(self):
+        student = create_user("kate", "katepass", user_type="student")
+        create_user("admin6", "adminpass6", user_type="staff")
+        logs = [Staff.logHoursForStudent(student.studentID, hours, "Library Aide") for hours in (8, 20)]
+        for log in logs:
+            log.status = "pending"
+        db.session.commit()
+        log_ids = [log.logID for log in logs]
+        result = staff_confirm_hours_batch("admin6", log_ids + ["missing"])
+        self.assertEqual(sorted(result['confirmed']), sorted(log_ids))
+        self.assertEqual(result['skipped'], ["missing"])
+        milestones = sorted(a.milestoneHours for a in Accolade.query.filter_by(studentID=student.studentID))
+        self.assertEqual(milestones, [10, 25])
+        entry = LeaderBoardEntry.query.filter_by(studentID=student.studentID).first()
+        self.assertEqual((entry.totalHours, entry.totalAccolades), (28, 2))
+        # Reranking only the range the student moved through matches a full rebuild
+        ranks = [(e.studentID, e.rank) for e in LeaderBoardEntry.query.order_by(LeaderBoardEntry.rank)]
+        self.assertEqual([rank for _, rank in ranks], list(range(1, len(ranks) + 1)))
+        update_leaderboard()
+        self.assertEqual(ranks, [(e.studentID, e.rank) for e in LeaderBoardEntry.query.order_by(LeaderBoardEntry.rank)])
+        self.assertEqual(staff_confirm_hours_batch("admin6", log_ids)['confirmed'], [])
+
+    def test_award_accolades_sweep(self):
+        student = create_user("leo", "leopass", user_type="student")
+        student.totalHours = 60
+        db.session.commit()
+        self.assertGreaterEqual(award_accolades(), 3)
+        milestones = sorted(a.milestoneHours for a in Accolade.query.filter_by(studentID=student.studentID))
+        self.assertEqual(milestones, [10, 25, 50])
+        self.assertEqual(award_accolades(), 0)
+
+    def test_bulk_import_resume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            students_path = os.path.join(tmp, 'students.csv')
+            with open(students_path, 'w') as f:
+                f.write('username,password\nimp_a,pass\nimp_b,pass\nimp_c,pass\n')
+            # A previous run committed the first row before failing
+            ImportCheckpoint.save(os.path.abspath(students_path), 'students', 1)
+            db.session.commit()
+            result = import_records('students', students_path, batch_size=2)
+            self.assertEqual((result['resumed_from'], result['rows'], result['created']), (1, 3, 2))
+            self.assertIsNone(get_user_by_username('imp_a'))
+            self.assertEqual(ImportCheckpoint.read(os.path.abspath(students_path), 'students'), 0)
+            logs_path = os.path.join(tmp, 'logs.jsonl')
+            with open(logs_path, 'w') as f:
+                f.write(json.dumps({'student_username': 'imp_b', 'hours': 12, 'activity': 'Archive', 'status': 'confirmed'}) + '\n')
+                f.write(json.dumps({'student_username': 'imp_a', 'hours': 3, 'activity': 'Archive'}) + '\n')
+            result = import_records('logs', logs_path)
+            self.assertEqual((result['created'], result['error_count']), (1, 1))
+            self.assertEqual(get_user_by_username('imp_b').totalHours, 12)
+            # Malformed values and duplicate log IDs are row errors, not chunk failures
+            with open(logs_path, 'w') as f:
+                for record in ({'student_username': ['imp_b'], 'hours': 1, 'activity': 'Odd'},
+                               {'student_username': 'imp_b', 'hours': 1, 'activity': {'a': 1}},
+                               {'student_username': 'imp_b', 'hours': 2, 'activity': 'Sorting', 'logID': 'imp-log'},
+                               {'student_username': 'imp_b', 'hours': 2, 'activity': 'Sorting', 'logID': 'imp-log'}):
+                    f.write(json.dumps(record) + '\n')
+            result = import_records('logs', logs_path)
+            self.assertEqual((result['created'], result['error_count']), (1, 3))
+            self.assertEqual([error['line'] for error in result['errors']], [1, 2, 4])
+            self.assertEqual(import_records('logs', logs_path)['created'], 0)
+
     def test_hour_rejection_workflow(self):
         student = create_user("frank", "frankpass", user_type="student")
         staff = create_user("admin4", "adminpass4", user_type="staff")
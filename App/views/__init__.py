@@ -4,8 +4,13 @@ from .user import user_views
 from .index import index_views
 from .auth import auth_views
 from .api_admin import listings_views
-from .admin import setup_admin
 
 
 views = [user_views, index_views, auth_views, listings_views]
-# blueprints must be added to this list
\ No newline at end of file
+# blueprints must be added to this list
+
+
+def setup_admin(app):
+    # Flask-Admin and WTForms are only imported once the admin UI is set up
+    from .admin import setup_admin
+    setup_admin(app)
\ No newline at end of file
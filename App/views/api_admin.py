@@ -1,14 +1,61 @@
-from flask import Blueprint, jsonify, request
+import os
+import uuid
+from functools import wraps
+from datetime import datetime
+from flask import Blueprint, jsonify, request, make_response, current_app, Response, stream_with_context
+from App.events import leaderboard_stream
+from App.jobs import job_runner
+from App.models import Staff
 from App.controllers import (staff_log_hours, 
+                            staff_log_hours_bulk,
                             request_confirmation, 
                             view_leaderboard,
+                            leaderboard_cursor,
+                            leaderboard_window,
                             view_accolades,
                             staff_confirm_hours,    
                             staff_reject_hours,
-                            update_leaderboard)
+                            staff_confirm_hours_batch,
+                            staff_reject_hours_batch,
+                            get_job,
+                            student_rank,
+                            get_data_version,
+                            iter_activity_logs,
+                            iter_leaderboard,
+                            format_export,
+                            hours_stats,
+                            login_required,
+                            EXPORT_FORMATS,
+                            ACTIVITY_LOG_COLUMNS,
+                            LEADERBOARD_COLUMNS)
 
 listings_views = Blueprint('api_admin_views', __name__, template_folder='../templates')
 
+def versioned(view=None, vary=None):
+    """Serve `view` with an ETag derived from the data version. A matching
+    If-None-Match gets a 304 without running the view's queries. `vary` may
+    return a string folded into the ETag when the response also depends on
+    something besides the data and the URL (e.g. today's date)."""
+    if view is None:
+        return lambda view: versioned(view, vary)
+    @wraps(view)
+    def decorated_view(*args, **kwargs):
+        etag = f"v{get_data_version()}"
+        extra = vary() if vary else None
+        if extra:
+            etag = f"{etag}-{extra}"
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.cache_control.max_age = current_app.config['HTTP_CACHE_MAX_AGE']
+        response.cache_control.must_revalidate = True
+        return response
+    return decorated_view
+
 @listings_views.route('/api/log_hours', methods=['POST'])
 def api_staff_log_hours():
     data = request.json
@@ -17,6 +64,23 @@ def api_staff_log_hours():
         return jsonify({'error': 'Failed to log hours'}), 400
     return jsonify({'message': f"Logged {log.hoursLogged} hours for student ID {log.studentID} with log ID {log.logID}"}), 201
 
+@listings_views.route('/api/log_hours/bulk', methods=['POST'])
+def api_staff_log_hours_bulk():
+    data = request.json
+    if not isinstance(data, dict) or not isinstance(data.get('staff_username'), str) \
+            or not isinstance(data.get('entries'), list):
+        return jsonify({'error': 'Expected staff_username and a list of entries'}), 400
+    result = staff_log_hours_bulk(data.get('staff_username'), data['entries'])
+    if result is None:
+        return jsonify({'error': 'Staff not found'}), 400
+    if not result['created'] and result['errors']:
+        return jsonify({'error': 'Failed to log hours', 'errors': result['errors']}), 400
+    return jsonify({
+        'message': f"Logged hours for {len(result['created'])} of {len(data['entries'])} entries",
+        'created': result['created'],
+        'errors': result['errors']
+    }), 201
+
 @listings_views.route('/api/request_confirmation', methods=['PUT'])     
 def api_request_confirmation():
     data = request.json
@@ -25,18 +89,70 @@ def api_request_confirmation():
         return jsonify({'error': 'Failed to request confirmation'}), 400
     return jsonify({'message': f"Requested confirmation for log ID {log.logID}"}), 200
 
+def request_window():
+    """(first_day, last_day) for the request's window/start/end arguments, or None."""
+    window = request.args.get('window')
+    if not window or window == 'all':
+        return None
+    start, end = (datetime.fromisoformat(request.args[key]).date() if request.args.get(key) else None
+                  for key in ('start', 'end'))
+    return leaderboard_window(window, start, end, term_starts=current_app.config['ACADEMIC_TERM_STARTS'])
+
+def window_day():
+    # Relative windows (week, month, term) move at midnight without any data changing
+    return datetime.utcnow().date().isoformat() if request.args.get('window') else None
+
 @listings_views.route('/api/leaderboard', methods=['GET'])
+@versioned(vary=window_day)
 def api_view_leaderboard():
-    leaderboard = view_leaderboard()
-    return jsonify(leaderboard), 200    
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', 0, type=int)
+    cursor = request.args.get('cursor')
+    if (limit is not None and limit < 0) or offset < 0:
+        return jsonify({'error': 'limit and offset must be non-negative'}), 400
+    try:
+        window = request_window()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        leaderboard = view_leaderboard(limit=limit, offset=offset, cursor=cursor, window=window)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    response = jsonify(leaderboard)
+    if limit and len(leaderboard) == limit:
+        response.headers['X-Next-Cursor'] = leaderboard_cursor(leaderboard[-1])
+    return response, 200
+
+@listings_views.route('/api/leaderboard/stream', methods=['GET'])
+def api_leaderboard_stream():
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    stream = leaderboard_stream(current_app._get_current_object(), last_event_id)
+    return Response(stream, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@listings_views.route('/api/students/<student_username>/rank', methods=['GET'])
+def api_student_rank(student_username):
+    k = request.args.get('k', 0, type=int)
+    if not 0 <= k <= 100:
+        return jsonify({'error': 'k must be between 0 and 100'}), 400
+    result = student_rank(student_username, k, current_app.config['LEADERBOARD_RANKING'])
+    if not result:
+        return jsonify({'error': 'Student not found on the leaderboard'}), 404
+    return jsonify(result), 200
 
 @listings_views.route('/api/accolades/<student_username>', methods=['GET'])
+@versioned
 def api_view_accolades(student_username):
     accolades_data = view_accolades(student_username)
     if not accolades_data:
         return jsonify({'error': 'Student not found'}), 404
     return jsonify(accolades_data), 200
 
+@listings_views.route('/api/stats/hours', methods=['GET'])
+@versioned
+def api_hours_stats():
+    return jsonify(hours_stats()), 200
+
 @listings_views.route('/api/staff/confirm_hours', methods=['PUT'])
 def api_staff_confirm_hours():
     data = request.json
@@ -53,8 +169,94 @@ def api_staff_reject_hours():
         return jsonify({'error': 'Failed to reject hours'}), 400
     return jsonify({'message': f"Rejected hours for log ID {log.logID}"}), 200
 
+def is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+@listings_views.route('/api/staff/confirm_hours/batch', methods=['PUT'])
+def api_staff_confirm_hours_batch():
+    data = request.json
+    if not isinstance(data, dict) or not is_string_list(data.get('activity_log_ids')):
+        return jsonify({'error': 'Expected staff_username and a list of activity_log_ids'}), 400
+    result = staff_confirm_hours_batch(data.get('staff_username'), data['activity_log_ids'])
+    if result is None:
+        return jsonify({'error': 'Failed to confirm hours'}), 400
+    return jsonify({'message': f"Confirmed {len(result['confirmed'])} activity logs", **result}), 200
+
+@listings_views.route('/api/staff/reject_hours/batch', methods=['PUT'])
+def api_staff_reject_hours_batch():
+    data = request.json
+    if not isinstance(data, dict) or not is_string_list(data.get('activity_log_ids')):
+        return jsonify({'error': 'Expected staff_username and a list of activity_log_ids'}), 400
+    result = staff_reject_hours_batch(data.get('staff_username'), data['activity_log_ids'])
+    if result is None:
+        return jsonify({'error': 'Failed to reject hours'}), 400
+    return jsonify({'message': f"Rejected {len(result['rejected'])} activity logs", **result}), 200
+
+def job_accepted(job, message):
+    response = jsonify({'message': message, 'job': job.to_json()})
+    response.headers['Location'] = f'/api/jobs/{job.jobID}'
+    return response, 202
+
 @listings_views.route('/api/update_leaderboard', methods=['PUT'])
+@login_required(Staff)
 def api_update_leaderboard():
-    update_leaderboard()
-    return jsonify({'message': 'Leaderboard updated successfully'}), 200            
+    # Requests arriving while a rebuild is still queued share that job
+    job = job_runner.submit(current_app._get_current_object(), 'update_leaderboard')
+    return job_accepted(job, 'Leaderboard update queued')
+
+@listings_views.route('/api/initialize', methods=['POST'])
+@login_required(Staff)
+def api_initialize():
+    # Drops and recreates every table, so only staff may queue it
+    job = job_runner.submit(current_app._get_current_object(), 'initialize_full')
+    return job_accepted(job, 'Initialization queued')
+
+@listings_views.route('/api/import/<kind>', methods=['POST'])
+@login_required(Staff)
+def api_import(kind):
+    # Uploads larger than MAX_CONTENT_LENGTH are refused with a 413
+    upload = request.files.get('file')
+    if kind not in ('students', 'staff', 'logs') or upload is None:
+        return jsonify({'error': 'POST a CSV or JSONL file to /api/import/students, /staff or /logs'}), 400
+    fmt = 'jsonl' if upload.filename.endswith(('.jsonl', '.ndjson')) else 'csv'
+    upload_dir = current_app.config['IMPORT_UPLOAD_DIR']
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f'{uuid.uuid4()}.{fmt}')
+    upload.save(path)
+    job = job_runner.submit(current_app._get_current_object(), 'import',
+                            {'kind': kind, 'path': path, 'fmt': fmt, 'remove': True})
+    return job_accepted(job, f'Import of {kind} queued')
+
+@listings_views.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    job = get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_json()), 200
+
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+def export_response(rows, columns, fmt, name):
+    body = stream_with_context(format_export(rows, columns, fmt))
+    return Response(body, mimetype=EXPORT_MIMETYPES[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={name}.{fmt}'})
+
+@listings_views.route('/api/export/activity_logs', methods=['GET'])
+def api_export_activity_logs():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        since, until = (datetime.fromisoformat(request.args[key]) if request.args.get(key) else None
+                        for key in ('since', 'until'))
+        rows = iter_activity_logs(status=request.args.get('status'), since=since, until=until)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return export_response(rows, ACTIVITY_LOG_COLUMNS, fmt, 'activity_logs')
 
+@listings_views.route('/api/export/leaderboard', methods=['GET'])
+def api_export_leaderboard():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    return export_response(iter_leaderboard(), LEADERBOARD_COLUMNS, fmt, 'leaderboard')
@@ -1,5 +1,7 @@
 from flask import Blueprint, redirect, render_template, request, send_from_directory, jsonify
 from App.controllers import create_user, initialize
+from App.metrics import metrics_response
+from App.database import pool_stats
 
 index_views = Blueprint('index_views', __name__, template_folder='../templates')
 
@@ -14,4 +16,9 @@ def init():
 
 @index_views.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({'status':'healthy'})
\ No newline at end of file
+    return jsonify({'status':'healthy', 'db_pool': pool_stats()})
+
+@index_views.route('/metrics', methods=['GET'])
+def metrics():
+    body, content_type = metrics_response()
+    return body, 200, {'Content-Type': content_type}
\ No newline at end of file
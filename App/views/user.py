@@ -1,4 +1,5 @@
-from flask import Blueprint, render_template, jsonify, request, send_from_directory, flash, redirect, url_for
+import json
+from flask import Blueprint, render_template, jsonify, request, send_from_directory, flash, redirect, url_for, Response, stream_with_context
 from flask_jwt_extended import jwt_required, current_user as jwt_current_user
 
 from.index import index_views
@@ -7,6 +8,8 @@ from App.controllers import (
     create_user,
     get_all_users,
     get_all_users_json,
+    get_users_page,
+    iter_users_json,
     jwt_required,
     create_staff,
     create_student
@@ -16,8 +19,9 @@ user_views = Blueprint('user_views', __name__, template_folder='../templates')
 
 @user_views.route('/users', methods=['GET'])
 def get_user_page():
-    users = get_all_users()
-    return render_template('users.html', users=users)
+    limit = max(1, min(request.args.get('limit', 50, type=int), 1000))
+    users, next_cursor = get_users_page(limit=limit, after=request.args.get('after'))
+    return render_template('users.html', users=users, next_cursor=next_cursor, limit=limit)
 
 @user_views.route('/users', methods=['POST'])
 def create_user_action():
@@ -28,8 +32,25 @@ def create_user_action():
 
 @user_views.route('/api/users', methods=['GET'])
 def get_users_action():
-    users = get_all_users_json()
-    return jsonify(users)
+    if 'limit' in request.args or 'after' in request.args:
+        order = request.args.get('order', 'username')
+        if order not in ('username', 'id'):
+            return jsonify({'error': 'order must be username or id'}), 400
+        try:
+            limit = int(request.args.get('limit', 100))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = max(1, min(limit, 1000))
+        users, next_cursor = get_users_page(limit=limit, after=request.args.get('after'), order=order)
+        return jsonify({'users': users, 'next': next_cursor})
+
+    # Without paging parameters stream the full list as one JSON array
+    def generate():
+        yield '['
+        for index, user in enumerate(iter_users_json()):
+            yield (',' if index else '') + json.dumps(user)
+        yield ']'
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @user_views.route('/api/users', methods=['POST'])
 def create_user_endpoint():
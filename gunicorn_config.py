@@ -1,19 +1,116 @@
 # gunicorn_config.py
-import multiprocessing
+import gc
+import os
+import shutil
+import tempfile
+
+# Directory the workers share their metrics through, so a /metrics scrape of
+# any one worker reports the whole instance. Must be set before the app loads.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'flask-metrics'))
+# A preloaded app creates its metrics before on_starting runs
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
 
 # The socket to bind.
 # "0.0.0.0" to bind to all interfaces. 8000 is the port number.
 bind = "0.0.0.0:8080"
 
-# The number of worker processes for handling requests.
-workers = 4
+# Build the app once in the master and fork the workers from it, so they
+# share its memory copy-on-write instead of each importing everything.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
 
 # Use the 'gevent' worker type for async performance.
 worker_class = 'gevent'
 
+if preload_app:
+    # The preloaded app must already see gevent's sockets and locks, so patch
+    # the master before it is imported (workers would otherwise patch after)
+    from gevent import monkey
+    monkey.patch_all()
+
+
+def memory_limit_mb():
+    """The container's memory limit if there is one, else physical memory."""
+    try:
+        with open('/sys/fs/cgroup/memory.max') as f:
+            return int(f.read()) // 2 ** 20
+    except (OSError, ValueError):  # no cgroup v2 limit ("max") or not Linux
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 2 ** 20
+
+
+def worker_count():
+    """One gevent worker per CPU, capped by how many fit in the memory
+    budget. WEB_WORKER_MEMORY_MB is the private memory each worker adds; see
+    `flask worker-memory` for measuring it."""
+    if os.environ.get('WEB_CONCURRENCY'):
+        return int(os.environ['WEB_CONCURRENCY'])
+    budget = int(os.environ.get('WEB_MEMORY_BUDGET_MB') or memory_limit_mb() * 3 // 4)
+    per_worker = int(os.environ.get('WEB_WORKER_MEMORY_MB', 64))
+    return max(1, min(os.cpu_count() or 1, budget // per_worker))
+
+
+# The number of worker processes for handling requests.
+workers = worker_count()
+
+# Greenlets (concurrent requests) per worker.
+worker_connections = 1000
+
+# Tell the app how many workers and greenlets share the database, so it can
+# size each worker's connection pool (see App.database.engine_options).
+os.environ.setdefault('FLASK_WEB_WORKERS', str(workers))
+os.environ.setdefault('FLASK_WORKER_CONNECTIONS', str(worker_connections))
+
 # Log level
 loglevel = 'info'
 
 # Where to log to
 accesslog = '-'  # '-' means log to stdout
-errorlog = '-'  # '-' means log to stderr
\ No newline at end of file
+errorlog = '-'  # '-' means log to stderr
+
+
+def on_starting(server):
+    # Start from an empty metrics directory so counters from a previous run don't linger
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    # Finish the setup deferred to the first request here, once, so workers
+    # inherit it; then move everything the master built to the GC's permanent
+    # generation so collections in the workers don't write to (and so copy)
+    # the pages holding those objects
+    app = server.app.wsgi()
+    app.extensions['deferred_setup']()
+    # Build the rank index once here too; the workers share it copy-on-write
+    from App.rankindex import rank_index
+    from App.database import db
+    with app.app_context():
+        rank_index.load()
+        db.session.remove()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Connections the master may have opened must not be shared with it
+        from App.database import dispose_engines
+        dispose_engines(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    # Poll the job table from the start, so jobs queued by the CLI or by
+    # another worker run without waiting for a submission to this one
+    from App.jobs import job_runner
+    job_runner.start(worker.wsgi)
+    # Keep the rank index current in the background (loading it first if
+    # the app was not preloaded), so rank lookups never wait on the database
+    from App.rankindex import rank_index
+    rank_index.start(worker.wsgi)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,34 @@
+"""leaderboard event autoincrement
+
+Revision ID: 6a8600fa1ade
+Revises: 77f306141df6
+Create Date: 2026-10-18 12:41:30.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a8600fa1ade'
+down_revision = '77f306141df6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres sequences never hand out an ID twice; SQLite needs AUTOINCREMENT,
+    # which it only accepts at CREATE TABLE, so the table is rebuilt
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('leaderboard_event', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('leaderboard_event', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
@@ -1,16 +1,19 @@
 import click # This is used to create CLI commands
-import pytest # This is used to run tests
+import json # This is used to print JSON output
 import sys # This is used to exit the program
 import uuid # This is used to generate unique IDs for the users
 from flask.cli import AppGroup
 
-from App.database import get_migrate, db
+from App.database import get_migrate, db, sqlite_maintenance, SQLITE_CHECKPOINT_MODES
 from App.models import User
 from App.main import create_app
+from App.startup import profile_imports, summarize_imports, IMPORT_BUDGET_MS, DEFERRED_MODULES
+from App.memory import worker_memory, workers_that_fit
 from App.controllers import (
     create_user,
     get_all_users_json,
     get_all_users,
+    iter_users_json,
     initialize,
     # admin controllers
     initialize_full,
@@ -20,14 +23,29 @@ from App.controllers import (
     view_accolades,
     staff_confirm_hours,
     staff_reject_hours,
-    update_leaderboard
+    staff_confirm_hours_batch,
+    update_leaderboard,
+    leaderboard_window,
+    rebuild_daily_rollups,
+    hours_stats,
+    award_accolades,
+    explain_queries,
+    import_records,
+    iter_activity_logs,
+    iter_leaderboard,
+    format_export,
+    ACTIVITY_LOG_COLUMNS,
+    LEADERBOARD_COLUMNS
 )
 from App.models import Student, LeaderBoardEntry, Accolade, ActivityLog, Staff
 
 # This commands file allow you to create convenient CLI commands for testing controllers
 
 app = create_app()
-migrate = get_migrate(app)
+# Only the flask CLI (which loads this module inside a click context) needs
+# the `flask db` commands; web workers skip importing Alembic
+if click.get_current_context(silent=True) is not None:
+    migrate = get_migrate(app)
 
 
 # This command creates and initializes the database
@@ -76,12 +94,24 @@ def request_confirmation_command(student_username, activity_log_id):
 
 @app.cli.command("view-leaderboard",
                  help="View student leaderboard ranked by confirmed hours")
-def view_leaderboard_command():
-    leaderboard_data = view_leaderboard()
+@click.option('--limit', type=int, default=None, help='Only show the top N students')
+@click.option('--offset', type=int, default=0, help='Skip the first N students')
+@click.option('--window', type=click.Choice(['week', 'month', 'term', 'custom']), default=None,
+              help='Only count hours logged this week, month or term, or from --start to --end')
+@click.option('--start', type=click.DateTime(['%Y-%m-%d']), default=None)
+@click.option('--end', type=click.DateTime(['%Y-%m-%d']), default=None)
+def view_leaderboard_command(limit, offset, window, start, end):
+    if window:
+        window = leaderboard_window(window, start and start.date(), end and end.date(),
+                                    term_starts=app.config['ACADEMIC_TERM_STARTS'])
+    leaderboard_data = view_leaderboard(limit=limit, offset=offset, window=window)
     print("Student Leaderboard (Ranked by Confirmed Community Service Hours):")
+    if window:
+        print(f"Hours logged {window[0]} to {window[1]}")
     print("=" * 70)
-    for rank, entry in enumerate(leaderboard_data, 1):
-        print(f"{rank}. {entry['username']} - {entry['total_hours']} hours - {entry['accolades']} accolades")
+    for rank, entry in enumerate(leaderboard_data, offset + 1):
+        accolades = f" - {entry['accolades']} accolades" if 'accolades' in entry else ''
+        print(f"{rank}. {entry['username']} - {entry['total_hours']} hours{accolades}")
     if not leaderboard_data:
         print("No students found with confirmed hours.")
 
@@ -117,6 +147,23 @@ def staff_confirm_hours_command(staff_username, activity_log_id):
     print(f'Activity: {activity_log.getDescription()}')
 
 
+@app.cli.command("staff-confirm-batch", help="Staff confirm many pending activity logs at once")
+@click.argument('staff_username', default='staff1')
+@click.argument('activity_log_ids', nargs=-1)
+@click.option('--all-pending', is_flag=True, help='Confirm every pending activity log')
+def staff_confirm_batch_command(staff_username, activity_log_ids, all_pending):
+    if not activity_log_ids and not all_pending:
+        print('Provide activity log ids or --all-pending')
+        return
+    result = staff_confirm_hours_batch(staff_username, None if all_pending else list(activity_log_ids))
+    if result is None:
+        print('Staff not found')
+        return
+    print(f"Staff {staff_username} confirmed {len(result['confirmed'])} activity logs")
+    for log_id in result['skipped']:
+        print(f'Skipped {log_id}: not found or not pending')
+
+
 @app.cli.command("view-activity-log", help="View details of a specific activity log")
 @click.argument('activity_log_id')
 def view_activity_log_command(activity_log_id):
@@ -151,10 +198,145 @@ def staff_reject_hours_command(staff_username, activity_log_id):
     print('Status changed to: rejected')
 
 @app.cli.command("update-leaderboard",
-                 help="Update leaderboard entries for all students")
+                 help="Rebuild leaderboard entries for all students (repair command)")
 def update_leaderboard_command():
     count = update_leaderboard()
-    print(f"Leaderboard updated successfully! {count} entries updated")
+    print(f"Leaderboard rebuilt successfully! {count} entries updated")
+
+
+@app.cli.command("backfill-rollups",
+                 help="Rebuild the daily confirmed-hour rollups behind windowed leaderboards")
+def backfill_rollups_command():
+    count = rebuild_daily_rollups()
+    print(f"Built {count} daily rollup rows")
+
+
+@app.cli.command("award-accolades",
+                 help="Award any missing milestone accolades to every student")
+def award_accolades_command():
+    awarded = award_accolades()
+    print(f"Awarded {awarded} missing accolades")
+
+
+@app.cli.command("db-explain", help="Show query plans for the controller queries")
+@click.option('--sql', is_flag=True, help='Also print each statement')
+def db_explain_command(sql):
+    scans = 0
+    for name, statement, plan, full_scan in explain_queries():
+        print(f"{name}{'  [FULL SCAN]' if full_scan else ''}")
+        if sql:
+            print(f"  {statement}")
+        for line in plan:
+            print(f"    {line}")
+        scans += full_scan
+    print(f"{scans} queries use a full table scan")
+
+
+@app.cli.command("import", help="Bulk import students, staff or activity logs from a CSV/JSONL file")
+@click.argument('kind', type=click.Choice(['students', 'staff', 'logs']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='File format (default: from the extension)')
+@click.option('--batch-size', type=int, default=1000, help='Rows inserted and committed per chunk')
+@click.option('--restart', is_flag=True, help='Ignore any checkpoint and start from the first row')
+def import_command(kind, path, fmt, batch_size, restart):
+    def report(result):
+        done = result['rows'] - result['resumed_from']
+        rate = done / result['seconds'] if result['seconds'] else 0
+        print(f"{result['rows']} rows read, {result['created']} created, "
+              f"{result['error_count']} errors ({rate:.0f} rows/s)")
+
+    result = import_records(kind, path, fmt=fmt, batch_size=batch_size, restart=restart, progress=report)
+    if result['resumed_from']:
+        print(f"Resumed after row {result['resumed_from']}")
+    for error in result['errors']:
+        print(f"Row {error['line']}: {error['error']}")
+    print(f"Imported {result['created']} {kind} in {result['seconds']:.1f}s")
+
+
+@app.cli.command("export", help="Stream activity logs or the leaderboard as CSV/JSONL")
+@click.argument('kind', type=click.Choice(['activity_logs', 'leaderboard']))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default='csv')
+@click.option('--status', type=click.Choice(['logged', 'pending', 'confirmed', 'rejected']), default=None,
+              help='Only export activity logs with this status')
+@click.option('--since', type=click.DateTime(), default=None, help='Only logs dated on or after this')
+@click.option('--until', type=click.DateTime(), default=None, help='Only logs dated before this')
+@click.option('--output', type=click.File('w'), default='-', help='Destination file (default: stdout)')
+def export_command(kind, fmt, status, since, until, output):
+    if kind == 'activity_logs':
+        rows, columns = iter_activity_logs(status=status, since=since, until=until), ACTIVITY_LOG_COLUMNS
+    else:
+        rows, columns = iter_leaderboard(), LEADERBOARD_COLUMNS
+    for line in format_export(rows, columns, fmt):
+        output.write(line)
+
+
+@app.cli.command("stats", help="Summarize the distribution of confirmed hours across students")
+@click.option('--json', 'as_json', is_flag=True, help='Print the full report as JSON')
+def stats_command(as_json):
+    stats = hours_stats()
+    if as_json:
+        print(json.dumps(stats, indent=2))
+        return
+    print(f"{stats['students']} students, {stats['confirmed_logs']} confirmed logs, "
+          f"{stats['total_hours']} hours (mean {stats['mean_hours']})")
+    print("Percentiles: " + ", ".join(f"{name}={value}" for name, value in stats['percentiles'].items()))
+    for bucket in stats['histogram']:
+        hours = f"{bucket['from']}-{bucket['to']}" if bucket['to'] is not None else f"{bucket['from']}+"
+        print(f"  {hours:>9} hours: {bucket['students']}")
+    for milestone in stats['milestones']:
+        days = milestone['median_days_to_reach']
+        print(f"{milestone['name']}: {milestone['students']} students ({milestone['share']:.1%})"
+              + (f", median {days} days to reach" if days is not None else ""))
+
+
+@app.cli.command("startup-profile", help="Break down the cold-start import time of the app")
+@click.option('--module', default='wsgi', help='Module to import in a fresh interpreter')
+@click.option('--top', type=int, default=15, help='How many packages and modules to list')
+def startup_profile_command(module, top):
+    entries = profile_imports(module)
+    summary = summarize_imports(entries, top)
+    status = 'over' if summary['total_ms'] > IMPORT_BUDGET_MS else 'within'
+    print(f"Importing {module}: {summary['total_ms']} ms across {summary['modules']} modules "
+          f"({status} the {IMPORT_BUDGET_MS} ms budget)")
+    print("\nBy package (self time):")
+    for package in summary['packages']:
+        print(f"  {package['ms']:>8.1f} ms  {package['package']}")
+    print("\nSlowest modules (self / cumulative):")
+    for entry in summary['slowest']:
+        print(f"  {entry['self_ms']:>8.1f} / {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+    loaded = sorted({name.split('.')[0] for name, *_ in entries} & set(DEFERRED_MODULES))
+    if loaded:
+        print(f"\nLoaded at startup but meant to be deferred: {', '.join(loaded)}")
+
+
+@app.cli.command("worker-memory", help="Report unique vs shared memory of a running gunicorn's workers")
+@click.argument('master_pid', type=int)
+@click.option('--budget-mb', type=int, default=None, help='Also show how many workers fit in this much memory')
+def worker_memory_command(master_pid, budget_mb):
+    report = worker_memory(master_pid)
+    print(f"{'process':<16}{'rss':>9}{'unique':>9}{'shared':>9}{'pss':>9}  (MB)")
+    rows = [(f"master {master_pid}", report['master'])]
+    rows += [(f"worker {worker['pid']}", worker) for worker in report['workers']]
+    for name, memory in rows:
+        print(f"{name:<16}{memory['rss']:>9}{memory['unique']:>9}{memory['shared']:>9}{memory['pss']:>9}")
+    print(f"Total PSS {report['total_pss']} MB; each worker adds about {report['worker_unique_mean']} MB")
+    if budget_mb and report['worker_unique_mean']:
+        fit = workers_that_fit(budget_mb, report['master']['rss'], report['worker_unique_mean'])
+        print(f"{fit} workers fit in {budget_mb} MB (set WEB_WORKER_MEMORY_MB={int(report['worker_unique_mean']) + 1})")
+
+
+@app.cli.command("db-maintenance", help="Checkpoint the SQLite WAL and refresh planner statistics")
+@click.option('--checkpoint-mode', type=click.Choice(SQLITE_CHECKPOINT_MODES, case_sensitive=False), default='TRUNCATE')
+@click.option('--vacuum', is_flag=True, help='Also rebuild the database file to reclaim free pages')
+def db_maintenance_command(checkpoint_mode, vacuum):
+    if db.engine.dialect.name != 'sqlite':
+        print('Maintenance is only needed for SQLite databases')
+        return
+    busy, log, checkpointed = sqlite_maintenance(checkpoint_mode.upper(), vacuum)
+    if busy:
+        print('Checkpoint could not complete while other connections were using the database')
+    print(f'Checkpointed {checkpointed} of {log} WAL pages; statistics optimized{" and database vacuumed" if vacuum else ""}')
 
 
 # eg : flask user <command>
@@ -176,10 +358,12 @@ def create_user_command(username, password):
 @user_cli.command("list", help="Lists users in the database")
 @click.argument("format", default="string")
 def list_user_command(format):
-    if format == 'string':
-        print(get_all_users())
-    else:
-        print(get_all_users_json())
+    # Rows are streamed from the database and printed as they arrive
+    for user in iter_users_json():
+        if format == 'string':
+            print(f"{user['id']} {user['username']}")
+        else:
+            print(json.dumps(user))
 
 
 app.cli.add_command(user_cli)  # add the group to the cli
@@ -193,6 +377,7 @@ test = AppGroup('test', help='Testing commands')
 @test.command("user", help="Run User tests")
 @click.argument("type", default="all")
 def user_tests_command(type):
+    import pytest # Only needed here; importing it up front slows every other command
     if type == "unit":
         sys.exit(pytest.main(["-k", "UserUnitTests"]))
     elif type == "int":